@@ -49,8 +49,15 @@ class FrameType(Enum):
 class ImageFormat(Enum):
     OPENCV = 0
     PIL = 1
+    TORCH_CUDA = 2
 
 class PoseComponents:
-    POS_ONLY = ['pos_x', 'pos_y', 'pos_z']
-    ROT_ONLY = ['quat_w', 'quat_x', 'quat_y', 'quat_z']
-    FULL = ['pos_x', 'pos_y', 'pos_z', 'quat_w', 'quat_x', 'quat_y', 'quat_z']
\ No newline at end of file
+    # Ordered components, for extracting values
+    POS_ORDER = ('pos_x', 'pos_y', 'pos_z')
+    ROT_ORDER = ('quat_w', 'quat_x', 'quat_y', 'quat_z')
+    FULL_ORDER = POS_ORDER + ROT_ORDER
+
+    # Unordered components, for membership checks (e.g., PoseComponents.FULL <= kwargs.keys())
+    POS_ONLY = frozenset(POS_ORDER)
+    ROT_ONLY = frozenset(ROT_ORDER)
+    FULL = frozenset(FULL_ORDER)
\ No newline at end of file
@@ -32,17 +32,53 @@ and read files.
 ### MODULES ###
 ###############
 
+from __future__ import annotations
+
+import os
 import pathlib
-from typing import List, Union
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Tuple, Union
 
 import numpy as np
 
 import cv2
 from PIL import Image
-import open3d as o3d
 
 from robotools.defines import FrameType, ImageFormat
 
+# Open3D is slow to import, so it is imported by the functions that use it
+if TYPE_CHECKING:
+    import open3d as o3d
+
+
+###############
+### DEFINES ###
+###############
+
+# Supported (lowercase) file extensions
+_IMAGE_EXTS = frozenset(('bmp', 'pbm', 'pgm', 'ppm', 'jpeg', 'jpg', 'jpe', 'jp2', 'tiff', 'tif', 'png'))
+_POINTCLOUD_EXTS = frozenset(('ply', 'pcd'))
+_CSV_EXTS = frozenset(('csv',))
+
+# Lookup from (lowercase) file extension to FrameType, built once at import
+_EXT_TO_FRAMETYPE = {ext: FrameType.IMAGE for ext in _IMAGE_EXTS}
+_EXT_TO_FRAMETYPE.update({ext: FrameType.POINTCLOUD for ext in _POINTCLOUD_EXTS})
+_EXT_TO_FRAMETYPE.update({ext: FrameType.CSVDATA for ext in _CSV_EXTS})
+
+# Path separators, '/' is accepted on all platforms
+_PATH_SEPS = '/' + os.sep
+
+# TurboJPEG decoder singleton, created on first use. Set to False if TurboJPEG is unavailable
+_TURBOJPEG = None
+
+# JPEG start of frame markers (baseline, progressive, lossless, arithmetic coded), excluding DHT (C4), JPG (C8) and DAC (CC)
+_JPEG_SOF_MARKERS = frozenset((0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+
+# Numpy's text parser is implemented in C from version 1.23, older versions are slower than Open3D's PCD reader
+_NUMPY_C_LOADTXT = tuple([int(x) for x in np.__version__.split('.')[:2]]) >= (1, 23)
+
 
 ########################
 ### PUBLIC FUNCTIONS ###
@@ -54,7 +90,7 @@ def supported_image_types() -> List:
     Returns:
         List: The list of supported image types.
     """
-    return ['bmp', 'pbm', 'pgm', 'ppm', 'jpeg', 'jpg', 'jpe', 'jp2', 'tiff', 'tif', 'png']
+    return sorted(_IMAGE_EXTS)
 
 
 def supported_pointcloud_types() -> List:
@@ -63,7 +99,7 @@ def supported_pointcloud_types() -> List:
     Returns:
         List: The list of supported point cloud types.
     """
-    return ['ply', 'pcd']
+    return sorted(_POINTCLOUD_EXTS)
 
 
 def supported_csv_types() -> List:
@@ -72,7 +108,7 @@ def supported_csv_types() -> List:
     Returns:
         List: The list of supported CSV file types.
     """
-    return ['csv']
+    return sorted(_CSV_EXTS)
 
 
 def extension_from_filepath(filepath: pathlib.Path) -> str:
@@ -82,16 +118,20 @@ def extension_from_filepath(filepath: pathlib.Path) -> str:
         filepath (pathlib.Path): The relative or absolute path to the file.
 
     Returns:
-        str: The extension for the file without the period.
+        str: The extension for the file without the period. Will return None if the file has no extension.
     """
-    filepath = pathlib.Path(filepath)
-    if len((filepath.name).rsplit('.',1)) == 2:
-        return (filepath.name).rsplit('.',1)[1]
-    return None
+    # Work on the string directly rather than constructing a pathlib.Path. The period must be
+    # within the filename and not its first character (e.g., '.bashrc')
+    head, sep, tail = os.fspath(filepath).rpartition('.')
+    if not sep or not head or head[-1] in _PATH_SEPS or '/' in tail or os.sep in tail:
+        return None
+    return tail
 
 
+@lru_cache(maxsize=256)
 def frametype_from_extension(extension: str) -> FrameType:
-    """Returns the FrameType given the file extension.
+    """Returns the FrameType given the file extension. The extension is not case sensitive. The result
+    is cached as a dataset typically contains only a handful of distinct extensions.
 
     Args:
         extension (str): The file extension without the period.
@@ -99,15 +139,9 @@ def frametype_from_extension(extension: str) -> FrameType:
     Returns:
         FrameType: The FrameType for the given extension.
     """
-
-    if extension in supported_image_types():
-        return FrameType.IMAGE
-    elif extension in supported_pointcloud_types():
-        return FrameType.POINTCLOUD
-    elif extension in supported_csv_types():
-        return FrameType.CSVDATA
-
-    return FrameType.UNKNOWN
+    if extension is None:
+        return FrameType.UNKNOWN
+    return _EXT_TO_FRAMETYPE.get(extension.lower(), FrameType.UNKNOWN)
 
 
 def frametype_from_filepath(filepath: pathlib.Path) -> FrameType:
@@ -119,50 +153,377 @@ def frametype_from_filepath(filepath: pathlib.Path) -> FrameType:
     Returns:
         FrameType: The FrameType for the given filepath.
     """
-    extension = extension_from_filepath(filepath)
-    return frametype_from_extension(extension)
+    return frametype_from_extension(extension_from_filepath(filepath))
 
 
-def read_image(filepath: pathlib.Path, image_format: ImageFormat = ImageFormat.OPENCV, colour: bool = True) -> Union[np.ndarray, Image.Image]:
+def read_image(filepath: pathlib.Path, image_format: ImageFormat = ImageFormat.OPENCV, colour: bool = True, reduce: int = 1,
+               box: Tuple[int, int, int, int] = None) -> Union[np.ndarray, Image.Image]:
     """Reads an image either as an OpenCV image (Numpy array, default behaviour) or as a PIL Image.
 
     Args:
         filepath (pathlib.Path): The file path to the image to be read.
-        image_format (ImageFormat, optional): The format to use. Options are ImageFormat.OPENCV or ImageFormat.PIL. Defaults to ImageFormat.OPENCV.
+        image_format (ImageFormat, optional): The format to use. Options are ImageFormat.OPENCV, ImageFormat.PIL, or ImageFormat.TORCH_CUDA
+            (a torch.Tensor on the GPU, see :func:`read_image_torch`). Defaults to ImageFormat.OPENCV.
         colour (bool, optional): Set to False to read the image as grayscale. Defaults to True.
+        reduce (int, optional): The factor to reduce the image size by while decoding. Options are 1, 2, 4, or 8. The reduced size
+            is rounded up for JPEGs and down for other formats. Defaults to 1.
+        box (Tuple[int, int, int, int], optional): The region to crop as (left, upper, right, lower) in pixel coordinates of the
+            (reduced) image. Callers only needing a crop should pass the box rather than cropping after reading. Defaults to None.
 
     Raises:
-        ValueError: If the passed image_format is not known.
+        ValueError: If the passed image_format is not known or the reduce factor is not supported.
 
     Returns:
-        Union[np.ndarray, Image.Image]: The image.
+        Union[np.ndarray, Image.Image, torch.Tensor]: The image.
     """
 
 
-    # Check if auto-detect if colour or grayscale is on, or user wants specific format
-    if image_format == ImageFormat.OPENCV:
-        return read_image_opencv(filepath, colour)
-    elif image_format == ImageFormat.PIL:
-        return read_image_pil(filepath, colour)
+    # Get the reader for the format, raising a value error if the format is not known
+    try:
+        reader = _IMAGE_READERS[image_format]
+    except KeyError:
+        raise ValueError("Unknown image format %d."%(image_format)) from None
+    return reader(filepath, colour, reduce, box)
+
+
+def read_image_into(filepath: pathlib.Path, out: np.ndarray, colour: bool = True) -> np.ndarray:
+    """Reads an image as an OpenCV image (Numpy array) into a pre-allocated array, such as a slice of a
+    (N, H, W, C) batch array. Where supported by the installed OpenCV (4.10 and later), the image is decoded
+    directly into the array, otherwise the decoded image is copied into it.
+
+    Args:
+        filepath (pathlib.Path): The file path to the image to be read.
+        out (np.ndarray): The contiguous uint8 array to read the image into, with shape (H, W, 3) for colour or (H, W) for grayscale.
+        colour (bool, optional): Set to False to read the image as grayscale. Must be True or False. Defaults to True.
+
+    Raises:
+        ValueError: If colour is not a bool, the file can not be decoded, or the image does not match the shape of the output array.
+
+    Returns:
+        np.ndarray: The output array.
+    """
+    if not isinstance(colour, bool):
+        raise ValueError("The colour argument must be True or False, got %s."%(colour))
+
+    # OpenCV returns the output array untouched, rather than None, when decoding into it fails
+    if not cv2.haveImageReader(str(filepath)):
+        raise ValueError("The image (%s) does not exist or can not be decoded."%(filepath))
+
+    flag = cv2.IMREAD_COLOR if colour else cv2.IMREAD_GRAYSCALE
+    try:
+        img = cv2.imread(str(filepath), out, flag)
+    except (TypeError, cv2.error):
+        img = cv2.imread(str(filepath), flag)
+
+    # OpenCV will allocate a new array if the image does not fit the output array
+    if img is not out:
+        if img is None or img.shape != out.shape:
+            raise ValueError("The image (%s) does not match the output array shape %s."%(filepath, out.shape))
+        np.copyto(out, img)
+    return out
+
+
+def read_image_turbojpeg(filepath: pathlib.Path, colour: bool = True, reduce: int = 1) -> np.ndarray:
+    """Reads a JPEG as an OpenCV image (Numpy array, BGR) by calling libjpeg-turbo directly via the
+    optional PyTurboJPEG package. This avoids the additional overhead of decoding via OpenCV. Falls back
+    to OpenCV if PyTurboJPEG or the libjpeg-turbo library is not available, or the file is not a JPEG.
 
-    # Raise value error
-    raise ValueError("Unknown image format %d."%(image_format))
+    Note, unlike OpenCV, TurboJPEG does not apply the EXIF orientation of the image.
 
+    Args:
+        filepath (pathlib.Path): The file path to the image to be read.
+        colour (bool, optional): Set to False to read the image as grayscale. Defaults to True.
+        reduce (int, optional): The factor to reduce the image size by while decoding. Options are 1, 2, 4, or 8. Defaults to 1.
+
+    Raises:
+        ValueError: If the reduce factor is not supported.
+
+    Returns:
+        np.ndarray: The read image.
+    """
+    check_reduce_factor(reduce)
+    turbojpeg = get_turbojpeg()
+    if turbojpeg is None or extension_from_filepath(filepath) not in ('jpeg', 'jpg', 'jpe'):
+        return read_image_opencv(filepath, colour, reduce)
+
+    from turbojpeg import TJPF_BGR, TJPF_GRAY
+    with open(filepath, 'rb') as f:
+        data = f.read()
+
+    # Decode, grayscale images are returned with a singleton channel which is removed
+    img = turbojpeg.decode(data, pixel_format=(TJPF_GRAY if colour is False else TJPF_BGR), scaling_factor=(1, reduce))
+    if colour is False:
+        return img.reshape(img.shape[:2])
+    elif colour is None:
+        return collapse_grayscale(img)
+    return img
 
-def read_pointcloud(filepath: pathlib.Path) -> o3d.geometry.PointCloud:
-    """Reads a point cloud and returns an Open3d Geometry PointCloud object.
+
+def read_image_torch(filepath: pathlib.Path, colour: bool = True, device: str = 'cuda') -> 'torch.Tensor':
+    """Reads an image as a torch.Tensor using torchvision. JPEGs are decoded directly on the device
+    using nvJPEG when the device is a CUDA device, avoiding a CPU decode and host to device copy. Other
+    image types are decoded on the CPU and then moved to the device. Requires the optional torchvision package.
+
+    Args:
+        filepath (pathlib.Path): The file path to the image to be read.
+        colour (bool, optional): Set to False to read the image as grayscale, or None to keep the channels stored in the file. Defaults to True.
+        device (str, optional): The torch device to decode the image to. Defaults to 'cuda'.
+
+    Returns:
+        torch.Tensor: The image as a uint8 tensor with shape (C, H, W). Colour images are RGB.
+    """
+    return read_images_torch([filepath], colour, device)[0]
+
+
+def read_images_torch(filepaths: List[pathlib.Path], colour: bool = True, device: str = 'cuda') -> List['torch.Tensor']:
+    """Reads a batch of images as torch.Tensors using torchvision. The JPEGs within the batch are decoded together
+    using a single batched nvJPEG call when the device is a CUDA device. Requires the optional torchvision package.
+
+    Args:
+        filepaths (List[pathlib.Path]): The file paths to the images to be read.
+        colour (bool, optional): Set to False to read the images as grayscale, or None to keep the channels stored in the files. Defaults to True.
+        device (str, optional): The torch device to decode the images to. Defaults to 'cuda'.
+
+    Returns:
+        List[torch.Tensor]: The images as uint8 tensors with shape (C, H, W), in the same order as the file paths.
+    """
+    from torchvision.io import ImageReadMode, decode_image, decode_jpeg, read_file
+
+    if colour is None:
+        mode = ImageReadMode.UNCHANGED
+    elif colour:
+        mode = ImageReadMode.RGB
+    else:
+        mode = ImageReadMode.GRAY
+
+    # Read the raw bytes and split the batch into JPEGs and other image types
+    data = [read_file(str(filepath)) for filepath in filepaths]
+    is_jpeg = [extension_from_filepath(filepath) in ('jpeg', 'jpg', 'jpe') for filepath in filepaths]
+
+    imgs = [None] * len(filepaths)
+    jpeg_idxs = [idx for idx, flag in enumerate(is_jpeg) if flag]
+    if len(jpeg_idxs) > 0:
+        decoded = decode_jpeg([data[idx] for idx in jpeg_idxs], mode=mode, device=device)
+        for idx, img in zip(jpeg_idxs, decoded):
+            imgs[idx] = img
+
+    for idx, flag in enumerate(is_jpeg):
+        if not flag:
+            imgs[idx] = decode_image(data[idx], mode=mode).to(device)
+
+    return imgs
+
+
+def read_image_mmap(filepath: pathlib.Path) -> np.ndarray:
+    """Reads an uncompressed image as a read-only memory mapped Numpy array. Only the pages of the file that are
+    accessed are read from disk, making this suitable for taking crops from large images. Supported files are
+    binary PGM/PPM files and TIFF files (requires the optional tifffile package). The image is returned exactly as
+    stored in the file, colour images are not converted to BGR and the colour options of :func:`read_image` do not apply.
+
+    Args:
+        filepath (pathlib.Path): The file path to the image to be read.
+
+    Raises:
+        ValueError: If the file type cannot be memory mapped.
+
+    Returns:
+        np.ndarray: The memory mapped image.
+    """
+    extension = extension_from_filepath(filepath)
+    if extension is not None and extension.lower() in ('pgm', 'ppm'):
+        return read_image_pnm_mmap(filepath)
+    elif extension is not None and extension.lower() in ('tif', 'tiff'):
+        return read_image_tiff_mmap(filepath)
+
+    raise ValueError("The file (%s) cannot be memory mapped. Supported file types are: pgm, ppm, tif, tiff."%(filepath))
+
+
+def read_image_shape(filepath: pathlib.Path) -> Tuple[int, int]:
+    """Reads the shape of an image from the file header without decoding the pixel data. The
+    imagesize package is used if installed, otherwise PIL is used which also only parses the header.
+
+    Args:
+        filepath (pathlib.Path): The file path to the image.
+
+    Returns:
+        Tuple[int, int]: The shape of the image as (height, width), the same order as a Numpy array.
+    """
+    try:
+        import imagesize
+        width, height = imagesize.get(str(filepath))
+        if width >= 0 and height >= 0:
+            return height, width
+    except ImportError:
+        pass
+
+    # Fallback, Image.open is lazy and does not decode the pixel data
+    with Image.open(str(filepath)) as img:
+        width, height = img.size
+    return height, width
+
+
+def read_pointcloud(filepath: pathlib.Path, tensor: bool = False, device: str = 'CPU:0') -> Union[o3d.geometry.PointCloud, o3d.t.geometry.PointCloud]:
+    """Reads a point cloud and returns an Open3d Geometry PointCloud object. The format is passed to Open3D
+    based on the file extension so Open3D does not need to determine it.
 
     Args:
         filepath (pathlib.Path): The file path to the point cloud to be read.
+        tensor (bool, optional): Set to True to read the point cloud using Open3D's tensor I/O and return an
+            o3d.t.geometry.PointCloud. The attributes of a tensor point cloud can be accessed as Numpy arrays
+            without a copy (e.g., pcd.point.positions.numpy()). Defaults to False.
+        device (str, optional): The Open3D device to move a tensor point cloud to (e.g., 'CUDA:0'). Only used when
+            tensor is True. Defaults to 'CPU:0'.
+
+    Returns:
+        Union[o3d.geometry.PointCloud, o3d.t.geometry.PointCloud]: The read point cloud.
+    """
+    import open3d as o3d
+
+    # Pass the format explicitly when the extension is known, skipping Open3D's format detection
+    extension = extension_from_filepath(filepath)
+    if extension is not None and extension.lower() in _POINTCLOUD_EXTS:
+        file_format = extension.lower()
+    else:
+        file_format = 'auto'
+
+    if tensor:
+        pcd = o3d.t.io.read_point_cloud(str(filepath), format=file_format)
+        device = o3d.core.Device(device)
+        return pcd if pcd.device == device else pcd.to(device)
+
+    # ASCII PCD files are parsed using Numpy's C based text parser, when available, which is faster than Open3D's
+    # reader. Files the parser does not understand are left to Open3D
+    if file_format == 'pcd' and _NUMPY_C_LOADTXT:
+        try:
+            header, offset = parse_pcd_header(filepath)
+            if header.get('DATA') == ['ascii']:
+                return read_pcd_ascii(filepath, header, offset)
+        except (ValueError, KeyError):
+            pass
+
+    return o3d.io.read_point_cloud(str(filepath), format=file_format)
+
+
+def read_pointcloud_mmap(filepath: pathlib.Path) -> o3d.geometry.PointCloud:
+    """Reads a binary PCD or binary little endian PLY point cloud by memory mapping the file. The header is parsed in
+    Python and the point data is accessed directly through a memory mapped Numpy array, avoiding the intermediate buffer
+    used by buffered file reads. The positions, and if present the colours and normals, are copied into the returned point cloud.
+
+    Args:
+        filepath (pathlib.Path): The file path to the point cloud to be read.
+
+    Raises:
+        ValueError: If the file is not a binary PCD or binary little endian PLY file, or its layout is not supported.
 
     Returns:
         o3d.geometry.PointCloud: The read point cloud.
     """
+    import open3d as o3d
+
+    extension = extension_from_filepath(filepath)
+    extension = extension.lower() if extension is not None else None
+    if extension == 'pcd':
+        dtype, num_points, offset = read_pcd_header(filepath)
+        colour_fields, normal_fields = None, ('normal_x', 'normal_y', 'normal_z')
+    elif extension == 'ply':
+        dtype, num_points, offset = read_ply_header(filepath)
+        colour_fields, normal_fields = ('red', 'green', 'blue'), ('nx', 'ny', 'nz')
+    else:
+        raise ValueError("The file (%s) cannot be memory mapped. Supported file types are: pcd, ply."%(filepath))
+
+    data = np.memmap(filepath, dtype=dtype, mode='r', offset=offset, shape=(num_points,))
+    names = dtype.names
+
+    pcd = o3d.geometry.PointCloud()
+    pcd.points = o3d.utility.Vector3dVector(np.stack([data['x'], data['y'], data['z']], axis=-1).astype(np.float64))
+
+    # Colours, PCD files pack the colour into a single 4 byte rgb/rgba field
+    if colour_fields is not None and all([x in names for x in colour_fields]):
+        colours = np.stack([data[x] for x in colour_fields], axis=-1)
+        pcd.colors = o3d.utility.Vector3dVector(colours / 255.0)
+    elif colour_fields is None and ('rgb' in names or 'rgba' in names):
+        packed = np.ascontiguousarray(data['rgb' if 'rgb' in names else 'rgba']).view(np.uint32)
+        pcd.colors = o3d.utility.Vector3dVector(unpack_pcd_colours(packed))
+
+    # Normals
+    if all([x in names for x in normal_fields]):
+        pcd.normals = o3d.utility.Vector3dVector(np.stack([data[x] for x in normal_fields], axis=-1).astype(np.float64))
 
-    pcd = o3d.io.read_point_cloud(str(filepath))
     return pcd
 
 
+def read_many(frames: Iterable, workers: int = None, **kwargs) -> List[Any]:
+    """Reads a set of frames (e.g., :class:`.RoboFrameImage` or :class:`.RoboFramePointCloud` objects) in parallel
+    using a thread pool. OpenCV and Open3D release the GIL while reading and decoding, so throughput scales with the
+    number of workers. For pure Python decoders (e.g., PIL without SIMD) a ProcessPoolExecutor may perform better.
+
+    Args:
+        frames (Iterable): the frames to be read.
+        workers (int, optional): the number of threads to use. Defaults to None, which uses the number of CPUs.
+        **kwargs: the keyword arguments passed to each frame's read method.
+
+    Returns:
+        List[Any]: the data for each frame, in the same order as the frames.
+    """
+    with ThreadPoolExecutor(workers or os.cpu_count()) as executor:
+        return list(executor.map(lambda frame: frame.read(**kwargs), frames))
+
+
+def iread_many(frames: Iterable, workers: int = None, window: int = 8, **kwargs) -> Iterator[Any]:
+    """Reads a set of frames in parallel using a thread pool, yielding the data for each frame in order. Unlike
+    :func:`read_many`, at most window frames are read ahead of the consumer, which bounds the memory used when
+    iterating over a large dataset.
+
+    Args:
+        frames (Iterable): the frames to be read.
+        workers (int, optional): the number of threads to use. Defaults to None, which uses the number of CPUs.
+        window (int, optional): the maximum number of frames being read, or read and not yet consumed. Defaults to 8.
+        **kwargs: the keyword arguments passed to each frame's read method.
+
+    Raises:
+        ValueError: If the window is less than 1.
+
+    Yields:
+        Iterator[Any]: the data for each frame, in the same order as the frames.
+    """
+    if window < 1:
+        raise ValueError("The window (%d) must be at least 1."%(window))
+
+    frames = iter(frames)
+    with ThreadPoolExecutor(workers or os.cpu_count()) as executor:
+        pending = deque()
+        try:
+            for frame in frames:
+                pending.append(executor.submit(frame.read, **kwargs))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # If the consumer stops early, cancel the queued reads so shutting down the executor only waits for
+            # the reads already running
+            for future in pending:
+                future.cancel()
+
+
+def prefetch_file(filepath: pathlib.Path) -> None:
+    """Hints to the operating system that a file will be read soon, so it can start reading the file into the page
+    cache in the background. This allows the reading of the next frame to overlap the decoding of the current frame.
+    Does nothing on platforms without posix_fadvise (e.g., Windows and macOS).
+
+    Args:
+        filepath (pathlib.Path): The file path to the file to be prefetched.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+
 def get_files(directory: pathlib.Path, pattern: str="*") -> list:
     """Gets the list of files from a directory given a pattern
     Args:
@@ -181,50 +542,455 @@ def get_files(directory: pathlib.Path, pattern: str="*") -> list:
 #########################
 
 
-def read_image_opencv(filepath: pathlib.Path, colour: bool = True) -> np.ndarray:
-    """Reads an image as an OpenCV image (Numpy array).
+def read_image_opencv(filepath: pathlib.Path, colour: bool = True, reduce: int = 1, box: Tuple[int, int, int, int] = None) -> np.ndarray:
+    """Reads an image as an OpenCV image (Numpy array). When reducing, OpenCV's IMREAD_REDUCED_* modes
+    are used which, for JPEGs, scale within the decoder (libjpeg-turbo in the PyPI OpenCV wheels) rather
+    than decoding the full resolution image.
 
     Args:
         filepath (pathlib.Path): The file path to the image to be read.
         colour (bool, optional): Set to False to read the image as grayscale. Defaults to True.
+        reduce (int, optional): The factor to reduce the image size by while decoding. Options are 1, 2, 4, or 8. Defaults to 1.
+        box (Tuple[int, int, int, int], optional): The region to crop as (left, upper, right, lower). The crop is a view into the
+            decoded image. Defaults to None.
+
+    Raises:
+        ValueError: If the reduce factor is not supported.
 
     Returns:
         np.ndarray: The read image.
     """
 
+    # Get the OpenCV read flags for the reduction factor
+    check_reduce_factor(reduce)
+    if reduce == 1:
+        colour_flag, grayscale_flag = cv2.IMREAD_COLOR, cv2.IMREAD_GRAYSCALE
+    else:
+        colour_flag = getattr(cv2, 'IMREAD_REDUCED_COLOR_%d'%(reduce))
+        grayscale_flag = getattr(cv2, 'IMREAD_REDUCED_GRAYSCALE_%d'%(reduce))
+
     # Check if auto-detect if colour or grayscale is on, or user wants specific format
     if colour is not None:
         if colour:
-            img = cv2.imread(str(filepath), cv2.IMREAD_COLOR)
+            img = cv2.imread(str(filepath), colour_flag)
         else:
-            img = cv2.imread(str(filepath), cv2.IMREAD_GRAYSCALE)
+            img = cv2.imread(str(filepath), grayscale_flag)
+    elif is_single_channel(filepath):
+        img = cv2.imread(str(filepath), grayscale_flag)
     else:
-        img = cv2.imread(str(filepath), cv2.IMREAD_COLOR)
-        b,g,r = img[:,:,0], img[:,:,1], img[:,:,2]
-        if (b==g).all() and (b==r).all():
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        img = collapse_grayscale(cv2.imread(str(filepath), colour_flag))
+
+    # Crop
+    if box is not None:
+        img = img[box[1]:box[3], box[0]:box[2]]
 
     # Return
     return img
 
 
-def read_image_pil(filepath: pathlib.Path, colour: bool = True) -> Image.Image:
+def read_image_pil(filepath: pathlib.Path, colour: bool = True, reduce: int = 1, box: Tuple[int, int, int, int] = None) -> Image.Image:
     """Reads an image into a PIL.Image.Image object.
 
     Args:
         filepath (pathlib.Path): The file path to the image to be read.
         colour (bool): Set to False to read the image as grayscale. Defaults to True.
+        reduce (int, optional): The factor to reduce the image size by. Options are 1, 2, 4, or 8. The reduced size is
+            rounded up for JPEGs and down for other formats, matching OpenCV. Defaults to 1.
+        box (Tuple[int, int, int, int], optional): The region to crop as (left, upper, right, lower). The crop is taken
+            before any grayscale conversion, so only the cropped region is converted. Defaults to None.
+
+    Raises:
+        ValueError: If the reduce factor is not supported.
 
     Returns:
         Image.Image: The read image.
     """
 
     # PIL appears to automatically choose the best "mode" (grayscale, RGB, etc.)
+    check_reduce_factor(reduce)
     img = Image.open(str(filepath))
 
+    # Reduce, JPEGs can be scaled by the decoder via draft, other formats are reduced after decoding. The
+    # reduced size matches OpenCV, rounded up for JPEGs (as libjpeg does) and rounded down for other formats
+    if reduce > 1:
+        width = img.width
+        size = ((img.width + reduce - 1) // reduce, (img.height + reduce - 1) // reduce)
+        draft = img.draft(img.mode, size)
+        if draft is not None:
+            # The decoder may choose a smaller scale than requested, so only reduce by the remaining factor
+            remaining = reduce // int(round(width / draft[1][2]))
+            if remaining > 1:
+                img = img.reduce(remaining)
+        else:
+            img = img.reduce(reduce, box=(0, 0, img.width - img.width % reduce, img.height - img.height % reduce))
+
+    # Crop before converting so only the required region is converted
+    if box is not None:
+        img = img.crop(box)
+
     # Force to grayscale
     if colour is False and img.mode != "L":
         img = img.convert('L')
 
     # Return
-    return img
\ No newline at end of file
+    return img
+
+
+def read_image_pnm_mmap(filepath: pathlib.Path) -> np.ndarray:
+    """Reads a binary (P5/P6) PGM or PPM image as a read-only memory mapped Numpy array.
+
+    Args:
+        filepath (pathlib.Path): The file path to the image to be read.
+
+    Raises:
+        ValueError: If the file is not a binary PGM or PPM file.
+
+    Returns:
+        np.ndarray: The memory mapped image, shape (H, W) for PGM files and (H, W, 3) RGB for PPM files.
+    """
+
+    # The header is the magic number, width, height, and maximum value separated by whitespace and
+    # optional comments, followed by a single whitespace character and then the raster data
+    with open(filepath, 'rb') as f:
+        header = f.read(4096)
+
+    tokens = []
+    idx = 0
+    while len(tokens) < 4 and idx < len(header):
+        if header[idx:idx+1] == b'#':
+            idx = header.find(b'\n', idx)
+            if idx < 0:
+                break
+        elif header[idx:idx+1].isspace():
+            idx += 1
+        else:
+            start = idx
+            while idx < len(header) and not header[idx:idx+1].isspace():
+                idx += 1
+            tokens.append(header[start:idx])
+
+    if len(tokens) != 4 or tokens[0] not in (b'P5', b'P6') or idx >= len(header):
+        raise ValueError("The file (%s) is not a binary PGM or PPM file."%(filepath))
+
+    width, height, maxval = int(tokens[1]), int(tokens[2]), int(tokens[3])
+    dtype = np.uint8 if maxval < 256 else np.dtype('>u2')
+    shape = (height, width) if tokens[0] == b'P5' else (height, width, 3)
+    return np.memmap(filepath, dtype=dtype, mode='r', offset=idx+1, shape=shape)
+
+
+def read_image_tiff_mmap(filepath: pathlib.Path) -> np.ndarray:
+    """Reads a TIFF image as a read-only memory mapped Numpy array using the optional tifffile package. If the
+    image data cannot be memory mapped (e.g., it is compressed), the image is read into memory instead.
+
+    Args:
+        filepath (pathlib.Path): The file path to the image to be read.
+
+    Returns:
+        np.ndarray: The memory mapped image.
+    """
+    import tifffile
+    try:
+        return tifffile.memmap(str(filepath), mode='r')
+    except ValueError:
+        return tifffile.imread(str(filepath))
+
+
+def parse_pcd_header(filepath: pathlib.Path) -> Tuple[Dict[str, List[str]], int]:
+    """Parses the header of a PCD file.
+
+    Args:
+        filepath (pathlib.Path): The file path to the PCD file.
+
+    Raises:
+        ValueError: If the file does not contain a valid PCD header.
+
+    Returns:
+        Tuple[Dict[str, List[str]], int]: the header entries keyed by the uppercase entry name, and the offset to the point data in bytes.
+    """
+    header = {}
+    with open(filepath, 'rb') as f:
+        while 'DATA' not in header:
+            line = f.readline()
+            if len(line) == 0:
+                raise ValueError("The file (%s) is not a valid PCD file."%(filepath))
+            line = line.decode('ascii', errors='replace').strip()
+            if len(line) == 0 or line.startswith('#'):
+                continue
+            key, _, value = line.partition(' ')
+            header[key.upper()] = value.split()
+        offset = f.tell()
+
+    if not all([x in header for x in ('FIELDS', 'SIZE', 'TYPE')]):
+        raise ValueError("The file (%s) is not a valid PCD file."%(filepath))
+    header.setdefault('COUNT', ['1'] * len(header['FIELDS']))
+    return header, offset
+
+
+def read_pcd_header(filepath: pathlib.Path) -> Tuple[np.dtype, int, int]:
+    """Reads the header of a binary PCD file.
+
+    Args:
+        filepath (pathlib.Path): The file path to the PCD file.
+
+    Raises:
+        ValueError: If the file is not a binary PCD file.
+
+    Returns:
+        Tuple[np.dtype, int, int]: the structured dtype for a point, the number of points, and the offset to the point data in bytes.
+    """
+    header, offset = parse_pcd_header(filepath)
+    if header['DATA'] != ['binary']:
+        raise ValueError("The file (%s) is not a binary PCD file."%(filepath))
+
+    # Build the structured dtype, padding fields ('_') are renamed so the field names are unique
+    fields = []
+    for idx, (name, size, _type, count) in enumerate(zip(header['FIELDS'], header['SIZE'], header['TYPE'], header['COUNT'])):
+        name = name if name != '_' else '_pad%d'%(idx)
+        kind = {'F': 'f', 'I': 'i', 'U': 'u'}[_type.upper()]
+        if int(count) == 1:
+            fields.append((name, '<%s%s'%(kind, size)))
+        else:
+            fields.append((name, '<%s%s'%(kind, size), (int(count),)))
+
+    if 'POINTS' in header:
+        num_points = int(header['POINTS'][0])
+    else:
+        num_points = int(header['WIDTH'][0]) * int(header['HEIGHT'][0])
+    return np.dtype(fields), num_points, offset
+
+
+def read_pcd_ascii(filepath: pathlib.Path, header: Dict[str, List[str]], offset: int) -> o3d.geometry.PointCloud:
+    """Reads the point data of an ASCII PCD file using Numpy's text parser.
+
+    Args:
+        filepath (pathlib.Path): The file path to the PCD file.
+        header (Dict[str, List[str]]): the parsed header, see :func:`parse_pcd_header`.
+        offset (int): the offset to the point data in bytes.
+
+    Returns:
+        o3d.geometry.PointCloud: The read point cloud.
+    """
+    import open3d as o3d
+
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        values = np.loadtxt(f, dtype=np.float64, ndmin=2)
+
+    # Get the column(s) and type for each field
+    columns, types, col = {}, {}, 0
+    for name, _type, count in zip(header['FIELDS'], header['TYPE'], header['COUNT']):
+        columns[name] = values[:, col:col+int(count)]
+        types[name] = _type.upper()
+        col += int(count)
+
+    pcd = o3d.geometry.PointCloud()
+    pcd.points = o3d.utility.Vector3dVector(np.hstack([columns['x'], columns['y'], columns['z']]))
+
+    # Colours are packed into a single rgb/rgba field, stored as either a float or an unsigned integer
+    name = 'rgb' if 'rgb' in columns else ('rgba' if 'rgba' in columns else None)
+    if name is not None:
+        column = columns[name][:, 0]
+        packed = column.astype(np.float32).view(np.uint32) if types[name] == 'F' else column.astype(np.uint32)
+        pcd.colors = o3d.utility.Vector3dVector(unpack_pcd_colours(packed))
+
+    if all([x in columns for x in ('normal_x', 'normal_y', 'normal_z')]):
+        pcd.normals = o3d.utility.Vector3dVector(np.hstack([columns['normal_x'], columns['normal_y'], columns['normal_z']]))
+
+    return pcd
+
+
+def unpack_pcd_colours(packed: np.ndarray) -> np.ndarray:
+    """Unpacks PCD colours, packed as 0x00RRGGBB, into an (N, 3) array of RGB values between 0 and 1.
+
+    Args:
+        packed (np.ndarray): the packed colours as uint32 values.
+
+    Returns:
+        np.ndarray: the (N, 3) array of RGB values.
+    """
+    return np.stack([(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], axis=-1) / 255.0
+
+
+def read_ply_header(filepath: pathlib.Path) -> Tuple[np.dtype, int, int]:
+    """Reads the header of a binary little endian PLY file. The vertex element must be the first element in the file
+    and must not contain any list properties.
+
+    Args:
+        filepath (pathlib.Path): The file path to the PLY file.
+
+    Raises:
+        ValueError: If the file is not a binary little endian PLY file or the vertex layout is not supported.
+
+    Returns:
+        Tuple[np.dtype, int, int]: the structured dtype for a vertex, the number of vertices, and the offset to the vertex data in bytes.
+    """
+    ply_types = {'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1', 'short': 'i2', 'int16': 'i2',
+                 'ushort': 'u2', 'uint16': 'u2', 'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+                 'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8'}
+
+    with open(filepath, 'rb') as f:
+        if f.readline().strip() != b'ply':
+            raise ValueError("The file (%s) is not a valid PLY file."%(filepath))
+
+        file_format, elements = None, []
+        while True:
+            line = f.readline()
+            if len(line) == 0:
+                raise ValueError("The file (%s) is not a valid PLY file."%(filepath))
+            tokens = line.decode('ascii', errors='replace').split()
+            if len(tokens) == 0:
+                continue
+            elif tokens[0] == 'end_header':
+                break
+            elif tokens[0] == 'format':
+                file_format = tokens[1]
+            elif tokens[0] == 'element':
+                elements.append((tokens[1], int(tokens[2]), []))
+            elif tokens[0] == 'property' and len(elements) > 0:
+                elements[-1][2].append(tokens[1:])
+        offset = f.tell()
+
+    if file_format != 'binary_little_endian':
+        raise ValueError("The file (%s) is not a binary little endian PLY file."%(filepath))
+    if len(elements) == 0 or elements[0][0] != 'vertex' or any([x[0] == 'list' for x in elements[0][2]]):
+        raise ValueError("The file (%s) must have the vertex element first and without list properties."%(filepath))
+
+    fields = [(x[1], '<%s'%(ply_types[x[0]])) for x in elements[0][2]]
+    return np.dtype(fields), elements[0][1], offset
+
+
+def check_reduce_factor(reduce: int) -> None:
+    """Checks the image reduction factor is supported.
+
+    Args:
+        reduce (int): The factor to reduce the image size by.
+
+    Raises:
+        ValueError: If the reduce factor is not 1, 2, 4, or 8.
+    """
+    if reduce not in (1, 2, 4, 8):
+        raise ValueError("Unsupported reduce factor %s. Supported factors are 1, 2, 4, or 8."%(reduce))
+
+
+def is_single_channel(filepath: pathlib.Path) -> bool:
+    """Checks if an image file stores a single channel by reading its header, without decoding the image.
+    JPEG (SOF component count), PNG (IHDR colour type) and TIFF (SamplesPerPixel tag) files are supported.
+
+    Args:
+        filepath (pathlib.Path): The file path to the image.
+
+    Returns:
+        bool: True if the image is known to be single channel, False if it is not or the header could not be parsed.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            signature = f.read(8)
+
+            # PNG, the colour type is the 26th byte of the file (0 = grayscale, 4 = grayscale with alpha)
+            if signature == b'\x89PNG\r\n\x1a\n':
+                ihdr = f.read(18)
+                return ihdr[4:8] == b'IHDR' and ihdr[17] in (0, 4)
+
+            # JPEG, walk the marker segments until the start of frame (SOF) segment
+            if signature[:2] == b'\xff\xd8':
+                f.seek(2)
+                while True:
+                    marker = f.read(2)
+                    if len(marker) < 2 or marker[0] != 0xFF:
+                        return False
+                    if marker[1] in _JPEG_SOF_MARKERS:
+                        segment = f.read(8)
+                        return len(segment) == 8 and segment[7] == 1
+                    if marker[1] in (0xD9, 0xDA): # end of image or start of scan
+                        return False
+                    length = int.from_bytes(f.read(2), 'big')
+                    f.seek(length - 2, os.SEEK_CUR)
+
+            # TIFF, look up SamplesPerPixel (277) and PhotometricInterpretation (262) in the first IFD
+            if signature[:4] in (b'II*\x00', b'MM\x00*'):
+                order = 'little' if signature[:2] == b'II' else 'big'
+                f.seek(int.from_bytes(signature[4:8], order))
+                num_entries = int.from_bytes(f.read(2), order)
+                entries = f.read(12 * num_entries)
+                samples, photometric = 1, None
+                for idx in range(0, len(entries), 12):
+                    tag = int.from_bytes(entries[idx:idx+2], order)
+                    if tag in (262, 277):
+                        value = int.from_bytes(entries[idx+8:idx+10], order)
+                        if tag == 262:
+                            photometric = value
+                        else:
+                            samples = value
+                return samples == 1 and photometric in (0, 1) # white/black is zero, not palette colour
+    except OSError:
+        pass
+    return False
+
+
+def collapse_grayscale(img: np.ndarray) -> np.ndarray:
+    """Converts a BGR image to a single channel grayscale image if all three channels are equal.
+
+    Args:
+        img (np.ndarray): The BGR image.
+
+    Returns:
+        np.ndarray: The grayscale image if all channels are equal, otherwise the original image.
+    """
+
+    # Compare the channels in blocks of rows, colour images typically differ within the first block
+    # so this exits early without comparing (and allocating a mask for) the whole image
+    for start in range(0, img.shape[0], 64):
+        block = img[start:start+64]
+        b = block[:,:,0]
+        if not (np.array_equal(b, block[:,:,1]) and np.array_equal(b, block[:,:,2])):
+            return img
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def get_turbojpeg():
+    """Gets the TurboJPEG decoder, creating it on the first call so the libjpeg-turbo library is only
+    loaded once.
+
+    Returns:
+        turbojpeg.TurboJPEG: The TurboJPEG decoder or None if PyTurboJPEG or libjpeg-turbo is not available.
+    """
+    global _TURBOJPEG
+    if _TURBOJPEG is None:
+        try:
+            from turbojpeg import TurboJPEG
+            _TURBOJPEG = TurboJPEG()
+        except (ImportError, OSError, RuntimeError):
+            _TURBOJPEG = False
+    return _TURBOJPEG or None
+
+
+def read_image_torch_cuda(filepath: pathlib.Path, colour: bool = True, reduce: int = 1, box: Tuple[int, int, int, int] = None) -> 'torch.Tensor':
+    """Reads an image as a torch.Tensor on the default CUDA device. See :func:`read_image_torch`.
+
+    Args:
+        filepath (pathlib.Path): The file path to the image to be read.
+        colour (bool, optional): Set to False to read the image as grayscale. Defaults to True.
+        reduce (int, optional): Not supported, must be 1. Defaults to 1.
+        box (Tuple[int, int, int, int], optional): The region to crop as (left, upper, right, lower). The crop is a view into the
+            decoded image. Defaults to None.
+
+    Raises:
+        ValueError: If the reduce factor is not 1.
+
+    Returns:
+        torch.Tensor: The image as a uint8 tensor with shape (C, H, W).
+    """
+    if reduce != 1:
+        raise ValueError("The reduce factor is not supported for ImageFormat.TORCH_CUDA.")
+    img = read_image_torch(filepath, colour)
+    if box is not None:
+        img = img[:, box[1]:box[3], box[0]:box[2]]
+    return img
+
+
+# Lookup from ImageFormat to the reader function, defined once the readers exist
+_IMAGE_READERS = {
+    ImageFormat.OPENCV: read_image_opencv,
+    ImageFormat.PIL: read_image_pil,
+    ImageFormat.TORCH_CUDA: read_image_torch_cuda,
+}
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+##################################################################################
+# MIT License                                                                    #
+#                                                                                #
+# Copyright (c) 2022 James Mount                                                 #
+#                                                                                #
+# Permission is hereby granted, free of charge, to any person obtaining a copy   #
+# of this software and associated documentation files (the "Software"), to deal  #
+# in the Software without restriction, including without limitation the rights   #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell      #
+# copies of the Software, and to permit persons to whom the Software is          #
+# furnished to do so, subject to the following conditions:                       #
+#                                                                                #
+# The above copyright notice and this permission notice shall be included in all #
+# copies or substantial portions of the Software.                                #
+#                                                                                #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR     #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,       #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE    #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER         #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,  #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE  #
+# SOFTWARE.                                                                      #
+##################################################################################
+
+"""The RoboTools Pose Utils module provides vectorised functions for converting between
+pose representations over many frames at once.
+"""
+
+###############
+### MODULES ###
+###############
+
+import math
+import numpy as np
+
+########################
+### PUBLIC FUNCTIONS ###
+########################
+
+def r2q_batch(R: np.ndarray) -> np.ndarray:
+    """Converts a set of rotation matrices to unit quaternions. This is a vectorised version of the
+    Spatial Maths r2q function (Cayley's method), and returns the same quaternions (to within floating
+    point rounding), in the same order (w, x, y, z) and with the same signs.
+
+    Args:
+        R (np.ndarray): the (N, 3, 3) rotation matrices.
+
+    Returns:
+        np.ndarray: the (N, 4) quaternions as [w, x, y, z].
+    """
+    R = np.asarray(R, dtype=np.float64)
+    r00, r01, r02 = R[:, 0, 0], R[:, 0, 1], R[:, 0, 2]
+    r10, r11, r12 = R[:, 1, 0], R[:, 1, 1], R[:, 1, 2]
+    r20, r21, r22 = R[:, 2, 0], R[:, 2, 1], R[:, 2, 2]
+
+    # Magnitude of each component
+    t12p, t13p, t23p = (r01 + r10) ** 2, (r02 + r20) ** 2, (r12 + r21) ** 2
+    t12m, t13m, t23m = (r01 - r10) ** 2, (r02 - r20) ** 2, (r12 - r21) ** 2
+    d1 = (r00 + r11 + r22 + 1) ** 2
+    d2 = (r00 - r11 - r22 + 1) ** 2
+    d3 = (-r00 + r11 - r22 + 1) ** 2
+    d4 = (-r00 - r11 + r22 + 1) ** 2
+    e = np.sqrt(np.stack([d1 + t23m + t13m + t12m, t23m + d2 + t12p + t13p,
+                          t13m + t12p + d3 + t23p, t12m + t13p + t23p + d4], axis=-1)) / 4.0
+
+    # The largest component is positive, the sign of the others depends on which component is largest.
+    # Row k of signs holds the sign sources for each component when component k is the largest
+    ones = np.ones_like(r00)
+    signs = np.stack([
+        np.stack([ones, r21 - r12, r02 - r20, r10 - r01], axis=-1),
+        np.stack([r21 - r12, ones, r10 + r01, r02 + r20], axis=-1),
+        np.stack([r02 - r20, r10 + r01, ones, r21 + r12], axis=-1),
+        np.stack([r10 - r01, r02 + r20, r21 + r12, ones], axis=-1)], axis=1)
+    largest = np.argmax(e, axis=1)
+    signs = np.take_along_axis(signs, largest[:, None, None], axis=1)[:, 0]
+    return np.copysign(e, signs)
+
+
+def r2q_scalar(R: np.ndarray) -> np.ndarray:
+    """Converts a single rotation matrix to a unit quaternion. This is equivalent to the Spatial Maths
+    r2q function, but works on Python floats and selects the signs from a lookup table rather than
+    branching, which is faster for a single matrix than both r2q and :func:`r2q_batch`.
+
+    Args:
+        R (np.ndarray): the 3x3 rotation matrix.
+
+    Returns:
+        np.ndarray: the quaternion as [w, x, y, z].
+    """
+    (r00, r01, r02), (r10, r11, r12), (r20, r21, r22) = np.asarray(R, dtype=np.float64).tolist()
+
+    # Magnitude of each component
+    t12p, t13p, t23p = (r01 + r10) ** 2, (r02 + r20) ** 2, (r12 + r21) ** 2
+    t12m, t13m, t23m = (r01 - r10) ** 2, (r02 - r20) ** 2, (r12 - r21) ** 2
+    e = (math.sqrt((r00 + r11 + r22 + 1) ** 2 + t23m + t13m + t12m) / 4.0,
+         math.sqrt(t23m + (r00 - r11 - r22 + 1) ** 2 + t12p + t13p) / 4.0,
+         math.sqrt(t13m + t12p + (-r00 + r11 - r22 + 1) ** 2 + t23p) / 4.0,
+         math.sqrt(t12m + t13p + t23p + (-r00 - r11 + r22 + 1) ** 2) / 4.0)
+
+    # The largest component is positive, the sign of the others depends on which component is largest
+    largest = e.index(max(e))
+    signs = ((1.0, r21 - r12, r02 - r20, r10 - r01),
+             (r21 - r12, 1.0, r10 + r01, r02 + r20),
+             (r02 - r20, r10 + r01, 1.0, r21 + r12),
+             (r10 - r01, r02 + r20, r21 + r12, 1.0))[largest]
+    return np.array([math.copysign(x, sign) for x, sign in zip(e, signs)])
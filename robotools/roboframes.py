@@ -32,17 +32,35 @@ metadata and functions for file I/O.
 ### MODULES ###
 ###############
 
+from __future__ import annotations
+
+import os
+import fnmatch
+import keyword
 import pathlib
 import numpy as np
-from typing import Tuple, Union, Any, Dict
+from typing import TYPE_CHECKING, Tuple, Union, Any, Dict, Iterator, List
 from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from robotools.defines import FrameType, ImageFormat, PoseComponents
+from robotools.file_utils import extension_from_filepath, frametype_from_filepath, prefetch_file, read_image, read_image_into, read_image_mmap, read_image_shape, read_images_torch, read_pointcloud, supported_image_types, supported_pointcloud_types
+from robotools.pose_utils import r2q_batch, r2q_scalar
 
-import open3d as o3d
-from PIL import Image
-import spatialmath as sm
+# Open3D and Spatial Maths are slow to import, so they are imported by the methods that use them
+if TYPE_CHECKING:
+    import open3d as o3d
+    import spatialmath as sm
+    from PIL import Image
+
+
+###############
+### DEFINES ###
+###############
+
+# Subclasses created by RoboFrame.from_schema, keyed by the base class and the lowercase field names
+_SCHEMA_CLASSES = {}
 
-from robotools.defines import ImageFormat, PoseComponents
-from robotools.file_utils import extension_from_filepath, read_image, read_pointcloud, supported_image_types, supported_pointcloud_types
 
 ###############
 ### CLASSES ###
@@ -59,6 +77,13 @@ class RoboFrame():
         pose (sm.SE3): the pose for the frame. Defaults to None.
     """
 
+    # The __dict__ slot is kept so fields can still be added dynamically via add_data, and the __weakref__
+    # slot so frames can still be weakly referenced
+    __slots__ = ('frame_id', 'timestamp', 'pose', '__dict__', '__weakref__')
+
+    # The slot descriptors of a schema subclass keyed by field name, both as given and lowercase. See from_schema
+    _FIELD_SLOTS = {}
+
     def __init__(self, frame_id: int, timestamp: float = None, pose: sm.SE3 = None) -> None:
         """The constructor for the RoboFrameBase class.
 
@@ -72,6 +97,42 @@ class RoboFrame():
         self.pose = pose
 
 
+    @classmethod
+    def from_schema(cls, fields: List[str]) -> type:
+        """Gets a subclass of this class that stores the given fields in slots rather than the instance dictionary,
+        for when the same fields are added to many frames (e.g., the columns of a CSV file). Slot storage uses less
+        memory and is faster to access. The subclass is created once per class and set of fields, and is cached.
+
+        Fields that are not valid identifiers, or would shadow an existing attribute (e.g., timestamp), are not given
+        a slot but can still be added using :meth:`add_data`.
+
+        Args:
+            fields (List[str]): the names of the fields. The fields will be converted to be all lowercase.
+
+        Returns:
+            type: the subclass, which is constructed the same way as this class.
+        """
+        fields = tuple(fields)
+        names = lowercase_fields(fields)
+
+        # Calling this on a schema subclass extends its schema, so subclasses are always created from the original class
+        base, base_names = getattr(cls, '_SCHEMA', (cls, ()))
+        key = (base, frozenset(names + base_names))
+        subclass = _SCHEMA_CLASSES.get(key)
+        if subclass is None:
+            slots = tuple(sorted([x for x in key[1] if x.isidentifier() and not keyword.iskeyword(x) and not hasattr(base, x)]))
+            subclass = type(base.__name__ + 'Schema', (base,), {'__slots__': slots, '__module__': base.__module__,
+                                                              '__reduce__': reduce_schema_frame, '_SCHEMA': (base, tuple(sorted(key[1])))})
+            subclass._FIELD_SLOTS = {x: subclass.__dict__[x] for x in slots}
+            _SCHEMA_CLASSES[key] = subclass
+
+        # Also map the field names as given, so add_data can write to the slot without converting the name to lowercase
+        for field, name in zip(fields, names):
+            if field not in subclass._FIELD_SLOTS and name in subclass._FIELD_SLOTS:
+                subclass._FIELD_SLOTS[field] = subclass._FIELD_SLOTS[name]
+        return subclass
+
+
     def add_data(self, field: Union[str, Tuple], value: Union[Any, Tuple]) -> None:
         """Adds a field (object attribute) to the object.
 
@@ -82,23 +143,33 @@ class RoboFrame():
         Raises:
             ValueError: if the length for fields and values is not equal.
         """
+        # Fast path for a single field, the most common case when loading data
         if isinstance(field, str):
-            field = tuple([field])
-        elif isinstance(field, list):
-            field = tuple(field)
-
-        if isinstance(value, str):
-            value = tuple([value])
-        elif isinstance(value, list):
-            value = tuple(value)
-        elif isinstance(value, tuple) is False:
-            value = tuple([value])
-        
+            if isinstance(value, (list, tuple)):
+                if len(value) != 1:
+                    raise ValueError("The number of fields and values must be equal.")
+                value = value[0]
+            slot = self._FIELD_SLOTS.get(field)
+            if slot is not None:
+                slot.__set__(self, value)
+            else:
+                setattr(self, field.lower(), value)
+            return
+
+        field = tuple(field)
+        value = tuple(value) if isinstance(value, (list, tuple)) else (value,)
         if len(field) != len(value):
             raise ValueError("The number of fields and values must be equal.")
 
-        for fld, val in zip(field, value):
-            setattr(self, fld.lower(), val)
+        # setattr is used rather than a bulk update of the instance dictionary, as fields such as
+        # timestamp and pose are slots which the instance dictionary would not update
+        field_slots = self._FIELD_SLOTS
+        for fld, name, val in zip(field, lowercase_fields(field), value):
+            slot = field_slots.get(fld)
+            if slot is not None:
+                slot.__set__(self, val)
+            else:
+                setattr(self, name, val)
 
 
     def has_field(self, field: str) -> bool:
@@ -118,19 +189,21 @@ class RoboFrame():
         [pos_x, pos_y, pos_z, quat_w, quat_x, quat_y, quat_z].
 
         Returns:
-            Dict: the pose data as a dictionary or None if the pose is not set or not a Spatial Maths SE(3) object.
+            Dict: the pose data as a dictionary or None if the pose is not set or not an SE(3) object (an object with
+            a 4x4 homogeneous transform as its A attribute, such as a Spatial Maths SE3 object).
         """
-        if self.pose is None:
-            return None
-        elif isinstance(self.pose, sm.SE3) is False:
+        # Duck typed rather than an isinstance check, so Spatial Maths does not need to be imported. The
+        # matrix is fetched once as each access of the A property goes through the Spatial Maths getter
+        A = getattr(self.pose, 'A', None)
+        if A is None or np.shape(A) != (4, 4):
             return None
 
-        data = {}
-        data['pos_x'] = self.pose.A[0,3]
-        data['pos_y'] = self.pose.A[1,3]
-        data['pos_z'] = self.pose.A[2,3]
+        quats = r2q_scalar(A[:3,:3])
 
-        quats = sm.base.r2q(self.pose.A[:3,:3])
+        data = {}
+        data['pos_x'] = A[0,3]
+        data['pos_y'] = A[1,3]
+        data['pos_z'] = A[2,3]
         data['quat_w'] = quats[0]
         data['quat_x'] = quats[1]
         data['quat_y'] = quats[2]
@@ -164,21 +237,14 @@ class RoboFrame():
             bool: true if the pose was successfully set.
         """
 
-        if all([x in kwargs for x in PoseComponents.FULL]):
-            self.pose = sm.SE3([kwargs.get(x) for x in PoseComponents.POS_ONLY])
-            self.pose.A[:3, :3] = sm.base.q2r([kwargs.get(x) for x in PoseComponents.ROT_ONLY])
-            return True
-
-        elif all([x in kwargs for x in PoseComponents.POS_ONLY]):
-            self.pose = sm.SE3([kwargs.get(x) for x in PoseComponents.POS_ONLY])
-            return True
+        T = pose_matrix(**kwargs)
+        if T is None:
+            return False
 
-        elif all([x in kwargs for x in PoseComponents.ROT_ONLY]):
-            self.pose = sm.SE3()
-            self.pose.A[:3, :3] = sm.base.q2r([kwargs.get(x) for x in PoseComponents.ROT_ONLY])
-            return True
-
-        return False
+        # The matrix is built from a unit quaternion, so the SE(3) validation can be skipped
+        import spatialmath as sm
+        self.pose = sm.SE3(T, check=False)
+        return True
 
 
 ### ROBO FRAME FILE ###
@@ -189,6 +255,8 @@ class RoboFrameFile(RoboFrame, ABC):
     The class is derived from the :class:`.RoboFrameBase` class.
     """
 
+    __slots__ = ('_filepath', '_filepath_str', '_name', '_stem', '_parent', '_ext', '_prefix', '_user_notes')
+
     def __init__(self, filepath: pathlib.Path) -> None:
         """The class constructor.
 
@@ -197,22 +265,38 @@ class RoboFrameFile(RoboFrame, ABC):
             filepath (pathlib.Path): the absolute path to the file.
         """
 
-        if isinstance(filepath, str):
-            filepath = pathlib.Path(filepath)
-
-        # Determine frame ID from file path
-        tmp = filepath.name
-        if len((tmp).rsplit('_')) > 1:
-            tmp = tmp.rsplit('_',1)[1]
+        # Init attributes, the frame ID is determined from the file path
+        super().__init__(frame_id_from_filename(os.path.basename(filepath)))
+        self.filepath = filepath
 
-        if len(tmp.split('.')) == 0:
-            frame_id = int(tmp)
-        else:
-            frame_id = int(tmp.split('.')[0])
+    # Filepath property
+    @property
+    def filepath(self) -> pathlib.Path:
+        """The absolute path to the file. Setting the filepath will update the cached filename properties.
 
-        # Init attributes
-        super().__init__(frame_id)
-        self.filepath = pathlib.Path(filepath)
+        Returns:
+            pathlib.Path: the absolute path to the file.
+        """
+        # The path object is only constructed when requested, the file I/O uses the string
+        if self._filepath is None:
+            self._filepath = pathlib.Path(self._filepath_str)
+        return self._filepath
+
+    @filepath.setter
+    def filepath(self, filepath: pathlib.Path) -> None:
+        self._filepath = None
+        self._filepath_str = os.fspath(filepath)
+
+        # Parse the filename once, the filename properties are then simple attribute loads
+        self._name = os.path.basename(self._filepath_str)
+        self._ext = extension_from_filepath(self._name)
+        self._stem = self._name[:-len(self._ext)-1] if self._ext else self._name
+        self._parent = None
+
+        # Filenames are of the form '<prefix>_<user_notes>_<frame_id>.<extension>'
+        parts = self._name.split('_')
+        self._prefix = parts[0] if len(parts) >= 2 else None
+        self._user_notes = '_'.join(parts[1:-1]) if len(parts) > 2 else None
 
     # Filename properties
     @property
@@ -222,7 +306,7 @@ class RoboFrameFile(RoboFrame, ABC):
         Returns:
             str: the filestem for the frame
         """
-        return self.filepath.stem
+        return self._stem
 
     @property
     def filename(self) -> str:
@@ -231,7 +315,7 @@ class RoboFrameFile(RoboFrame, ABC):
         Returns:
             str: the filename for the frame
         """
-        return self.filepath.name
+        return self._name
 
     @property
     def rootpath(self) -> pathlib.Path:
@@ -240,7 +324,9 @@ class RoboFrameFile(RoboFrame, ABC):
         Returns:
             str: the absolute path to the parent folder for the frame.
         """
-        return self.filepath.parent
+        if self._parent is None:
+            self._parent = pathlib.Path(os.path.dirname(self._filepath_str))
+        return self._parent
 
     @property
     def extension(self) -> str:
@@ -249,7 +335,7 @@ class RoboFrameFile(RoboFrame, ABC):
         Returns:
             str: The extension for the frame without the period. Will return None if the file has no extension.
         """
-        return extension_from_filepath(self.filepath)
+        return self._ext
 
     @property
     def prefix(self) -> str:
@@ -258,9 +344,7 @@ class RoboFrameFile(RoboFrame, ABC):
         Returns:
             str: The prefix for the frame. Will return None if the file has no prefix.
         """
-        if len((self.filepath.name).split('_',1)) == 2:
-            return (self.filepath.name).split('_',1)[0]
-        return None
+        return self._prefix
 
     @property
     def user_notes(self) -> str:
@@ -269,9 +353,13 @@ class RoboFrameFile(RoboFrame, ABC):
         Returns:
             str: The user notes contained within the filename. Will return None if no user notes exists.
         """
-        if len((self.filepath.name).split('_')) <= 2:
-            return None
-        return ((self.filepath.name).split('_',1)[1]).rsplit('_',1)[0]
+        return self._user_notes
+
+    def prefetch(self) -> None:
+        """Hints to the operating system that the file will be read soon. Calling this on the next frame
+        while the current frame is being decoded overlaps the disk reads with the decoding.
+        """
+        prefetch_file(self._filepath_str)
 
     @abstractmethod
     def read(self, **kwargs): # pragma: no cover
@@ -288,6 +376,8 @@ class RoboFrameImage(RoboFrameFile):
     The class is derived from the :class:`.RoboFrameFile` class.
     """
 
+    __slots__ = ()
+
     def __init__(self, filepath: pathlib.Path) -> None:
         """The class constructor.
 
@@ -297,30 +387,80 @@ class RoboFrameImage(RoboFrameFile):
         Raises:
             ValueError: if the file is not a supported image type.
         """
-        if extension_from_filepath(filepath) not in supported_image_types():
+        if frametype_from_filepath(filepath) != FrameType.IMAGE:
             raise ValueError("The file (%s) is not a supported image file type. Supported image file types are: %s."%(filepath, ', '.join(supported_image_types())))
 
         super().__init__(filepath)
 
     
-    def read(self, **kwargs) -> Union[np.ndarray, Image.Image]:
+    def read(self, image_format: ImageFormat = ImageFormat.OPENCV, colour: bool = True, reduce: int = 1,
+             box: Tuple[int, int, int, int] = None, mmap: bool = False, **kwargs) -> Union[np.ndarray, Image.Image]:
         """Reads an image file and returns the data. The image can be either read in as
         an OpenCV image (numpy array) or as a PIL image. The image can be forced to be read
         in as colour, grayscale, or automatically determined.
 
         Args:
-            **kwargs:
-                **image_format** (:class:`.ImageFormat`, optional): the format for the returned image data. Defaults to ImageFormat.OPENCV
-                
-                **colour** (*bool*, optional): used to force the image colour type. Set to True to read in colour, False for grayscale, or
+            image_format (:class:`.ImageFormat`, optional): the format for the returned image data. Defaults to ImageFormat.OPENCV
+            colour (bool, optional): used to force the image colour type. Set to True to read in colour, False for grayscale, or
                 None if the colour should be automatically determined. Defaults to True.
+            reduce (int, optional): the factor to reduce the image size by while decoding. Options are 1, 2, 4, or 8. Defaults to 1.
+            box (Tuple[int, int, int, int], optional): the region to crop as (left, upper, right, lower). Callers only needing
+                a crop (e.g., center or random crops) should pass the box rather than cropping after reading. Defaults to None.
+            mmap (bool, optional): set to True to return the image as a read-only memory mapped Numpy array, exactly as stored
+                in the file. Only supported for uncompressed images (see :func:`robotools.file_utils.read_image_mmap`), the other
+                options are ignored. Defaults to False.
+            **kwargs: unused, accepted for compatibility with :meth:`.RoboFrameFile.read`.
 
         Returns:
             Union[np.ndarray, Image.Image]: the returned image.
         """
-        image_format = kwargs.get('image_format', ImageFormat.OPENCV)
-        colour = kwargs.get('colour', True)
-        return read_image(self.filepath, image_format, colour)
+        if mmap:
+            return read_image_mmap(self._filepath_str)
+        return read_image(self._filepath_str, image_format, colour, reduce, box)
+
+
+    def read_into(self, out: np.ndarray, colour: bool = True) -> np.ndarray:
+        """Reads the image as an OpenCV image (Numpy array) into a pre-allocated array, such as a slice of a
+        (N, H, W, C) batch array. See :func:`robotools.file_utils.read_image_into`.
+
+        Args:
+            out (np.ndarray): the contiguous uint8 array to read the image into.
+            colour (bool, optional): set to False to read the image as grayscale. Must be True or False. Defaults to True.
+
+        Raises:
+            ValueError: if the image can not be decoded or does not match the shape of the output array.
+
+        Returns:
+            np.ndarray: the output array.
+        """
+        return read_image_into(self._filepath_str, out, colour)
+
+
+    @classmethod
+    def read_batch(cls, frames: List['RoboFrameImage'], device: str = 'cuda', colour: bool = True) -> List['torch.Tensor']:
+        """Reads a batch of image frames as torch.Tensors. The JPEGs in the batch are decoded together on the
+        GPU using nvJPEG when the device is a CUDA device. Requires the optional torchvision package.
+
+        Args:
+            frames (List[RoboFrameImage]): the image frames to be read.
+            device (str, optional): the torch device to decode the images to. Defaults to 'cuda'.
+            colour (bool, optional): set to False to read the images as grayscale, or None to keep the channels
+                stored in the files. Defaults to True.
+
+        Returns:
+            List[torch.Tensor]: the images as uint8 tensors with shape (C, H, W), in the same order as the frames.
+        """
+        return read_images_torch([frame._filepath_str for frame in frames], colour, device)
+
+
+    def shape(self) -> Tuple[int, int]:
+        """Gets the shape of the image by only reading the file header. This is significantly faster than
+        reading the image when only the dimensions are required.
+
+        Returns:
+            Tuple[int, int]: the shape of the image as (height, width).
+        """
+        return read_image_shape(self._filepath_str)
 
 
 ### ROBO FRAME POINT CLOUD ###
@@ -331,6 +471,8 @@ class RoboFramePointCloud(RoboFrameFile):
     The class is derived from the :class:`.RoboFrameFile` class.
     """
 
+    __slots__ = ()
+
     def __init__(self, filepath: pathlib.Path) -> None:
         """The class constructor.
 
@@ -340,22 +482,273 @@ class RoboFramePointCloud(RoboFrameFile):
         Raises:
             ValueError: if the file is not a supported image type.
         """
-        if extension_from_filepath(filepath) not in supported_pointcloud_types():
+        if frametype_from_filepath(filepath) != FrameType.POINTCLOUD:
             raise ValueError("The file (%s) is not a supported point cloud file type. Supported point cloud file types are: %s."%(filepath, ', '.join(supported_pointcloud_types())))
 
         super().__init__(filepath)
 
     
-    def read(self, **kwargs) -> o3d.geometry.PointCloud:
+    def read(self, tensor: bool = False, device: str = 'CPU:0', **kwargs) -> Union[o3d.geometry.PointCloud, o3d.t.geometry.PointCloud]:
         """Reads a point cloud file and returns the data as an Open3D point cloud object.
 
         Args:
+            tensor (bool, optional): set to True to read the point cloud using Open3D's tensor I/O and return an
+                o3d.t.geometry.PointCloud. Defaults to False.
+            device (str, optional): the Open3D device to move a tensor point cloud to (e.g., 'CUDA:0'). Only used when
+                tensor is True. Defaults to 'CPU:0'.
             **kwargs: None
 
         Returns:
-            o3d.geometry.PointCloud: the returned point cloud.
+            Union[o3d.geometry.PointCloud, o3d.t.geometry.PointCloud]: the returned point cloud.
         """
-        return read_pointcloud(self.filepath)
+        return read_pointcloud(self._filepath_str, tensor=tensor, device=device)
+
+
+### ROBO FRAME SET ###
+class RoboFrameSet():
+    """A set of frames stored as columns (one Numpy array per attribute) rather than as individual frame objects.
+    Bulk operations over a set (e.g., sorting by timestamp or exporting poses) only touch the columns they use.
+    Individual frames are materialised as :class:`.RoboFrame`, :class:`.RoboFrameImage` or :class:`.RoboFramePointCloud`
+    objects when indexed.
+
+    Attributes:
+        frame_ids (np.ndarray): the (N,) frame ID numbers.
+        timestamps (np.ndarray): the (N,) timestamps. Frames without a timestamp are NaN.
+        poses (np.ndarray): the (N, 4, 4) homogeneous transforms. Frames without a pose are NaN.
+        filepaths (np.ndarray): the (N,) file paths as strings. Frames without a file are None.
+    """
+
+    __slots__ = ('frame_ids', 'timestamps', 'poses', 'filepaths')
+
+    def __init__(self, n: int) -> None:
+        """The constructor for the RoboFrameSet class. The columns are allocated for n frames which have no timestamp, pose or file.
+
+        Args:
+            n (int): the number of frames in the set.
+        """
+        self.frame_ids = np.zeros(n, dtype=np.int64)
+        self.timestamps = np.full(n, np.nan, dtype=np.float64)
+        self.poses = np.full((n, 4, 4), np.nan, dtype=np.float64)
+        self.filepaths = np.full(n, None, dtype=object)
+
+
+    @classmethod
+    def from_frames(cls, frames: List[RoboFrame]) -> 'RoboFrameSet':
+        """Creates a set from a list of frame objects.
+
+        Args:
+            frames (List[RoboFrame]): the frames.
+
+        Returns:
+            RoboFrameSet: the set containing the frames.
+        """
+        frames = list(frames)
+        frameset = cls(len(frames))
+        for idx, frame in enumerate(frames):
+            frameset.frame_ids[idx] = frame.frame_id
+            if frame.timestamp is not None:
+                frameset.timestamps[idx] = frame.timestamp
+            A = getattr(frame.pose, 'A', None)
+            if A is not None and np.shape(A) == (4, 4):
+                frameset.poses[idx] = A
+            if isinstance(frame, RoboFrameFile):
+                frameset.filepaths[idx] = frame._filepath_str
+        return frameset
+
+
+    @classmethod
+    def from_columns(cls, frame_ids: np.ndarray, timestamps: np.ndarray = None, poses: np.ndarray = None,
+                     filepaths: List[str] = None) -> 'RoboFrameSet':
+        """Creates a set directly from columns of data (e.g., loaded from a CSV file), without creating
+        a frame object per row.
+
+        Args:
+            frame_ids (np.ndarray): the (N,) frame ID numbers.
+            timestamps (np.ndarray, optional): the (N,) timestamps. Defaults to None.
+            poses (np.ndarray, optional): the (N, 4, 4) homogeneous transforms. Defaults to None.
+            filepaths (List[str], optional): the N file paths, None for frames without a file. Defaults to None.
+
+        Raises:
+            ValueError: if the length of a column does not match the number of frame IDs.
+
+        Returns:
+            RoboFrameSet: the set containing the frames.
+        """
+        frame_ids = np.asarray(frame_ids)
+        frameset = cls(len(frame_ids))
+        frameset.frame_ids[:] = frame_ids
+
+        for name, column in (('timestamps', timestamps), ('poses', poses), ('filepaths', filepaths)):
+            if column is None:
+                continue
+            if len(column) != len(frameset):
+                raise ValueError("The %s column has %d rows, expected %d."%(name, len(column), len(frameset)))
+            if name == 'filepaths':
+                frameset.filepaths[:] = [os.fspath(x) if x is not None else None for x in column]
+            else:
+                getattr(frameset, name)[:] = column
+        return frameset
+
+
+    @classmethod
+    def from_directory(cls, dirpath: pathlib.Path, pattern: str = '*') -> 'RoboFrameSet':
+        """Creates a set from the image and point cloud files within a directory. The directory is listed once
+        using os.scandir, and the frames are classified by file name without calling stat on each file.
+
+        Args:
+            dirpath (pathlib.Path): the path to the directory.
+            pattern (str, optional): the pattern the file names must match (e.g., '*.png'). Defaults to '*'.
+
+        Raises:
+            ValueError: if a frame ID cannot be determined from a file name.
+
+        Returns:
+            RoboFrameSet: the set containing the frames, sorted by file name.
+        """
+        dirpath = os.fspath(dirpath)
+        with os.scandir(dirpath) as entries:
+            names = sorted([entry.name for entry in entries if fnmatch.fnmatch(entry.name, pattern) and entry.is_file()
+                            and frametype_from_filepath(entry.name) in (FrameType.IMAGE, FrameType.POINTCLOUD)])
+
+        frameset = cls(len(names))
+        frameset.frame_ids[:] = [frame_id_from_filename(name) for name in names]
+        frameset.filepaths[:] = [os.path.join(dirpath, name) for name in names]
+        return frameset
+
+
+    def __len__(self) -> int:
+        return len(self.frame_ids)
+
+
+    def __getitem__(self, idx: int) -> RoboFrame:
+        """Materialises a single frame from the set.
+
+        Args:
+            idx (int): the index of the frame within the set.
+
+        Raises:
+            ValueError: if the frame's file is not a supported image or point cloud file type.
+
+        Returns:
+            RoboFrame: a :class:`.RoboFrameImage` or :class:`.RoboFramePointCloud` if the frame has a file, otherwise a :class:`.RoboFrame`.
+        """
+        filepath = self.filepaths[idx]
+        if filepath is None:
+            frame = RoboFrame(int(self.frame_ids[idx]))
+        else:
+            frametype = frametype_from_filepath(filepath)
+            if frametype == FrameType.IMAGE:
+                frame = RoboFrameImage(filepath)
+            elif frametype == FrameType.POINTCLOUD:
+                frame = RoboFramePointCloud(filepath)
+            else:
+                raise ValueError("The file (%s) is not a supported image or point cloud file type."%(filepath))
+            frame.frame_id = int(self.frame_ids[idx])
+
+        timestamp = self.timestamps[idx]
+        if not np.isnan(timestamp):
+            frame.timestamp = float(timestamp)
+        if not np.isnan(self.poses[idx, 0, 0]):
+            import spatialmath as sm
+            frame.pose = sm.SE3(self.poses[idx].copy(), check=False)
+        return frame
+
+
+    def __iter__(self) -> Iterator[RoboFrame]:
+        """Iterates over the frames in the set, materialising each frame in turn. The next frame's file is
+        prefetched before each frame is yielded, so the disk read overlaps the caller reading the current frame.
+
+        Yields:
+            Iterator[RoboFrame]: the frames in the set, see :meth:`__getitem__`.
+        """
+        for idx in range(len(self)):
+            if idx + 1 < len(self) and self.filepaths[idx + 1] is not None:
+                # The prefetch is only a hint, a missing file is reported when it is read
+                try:
+                    prefetch_file(self.filepaths[idx + 1])
+                except OSError:
+                    pass
+            yield self[idx]
+
+
+    def set_pose(self, idx: int, **kwargs) -> bool:
+        """Sets the pose data for a frame in the set using a set of keyword arguments. See :meth:`.RoboFrame.set_pose`
+        for the keyword arguments.
+
+        Args:
+            idx (int): the index of the frame within the set.
+
+        Returns:
+            bool: true if the pose was successfully set.
+        """
+        T = pose_matrix(**kwargs)
+        if T is None:
+            return False
+
+        self.poses[idx] = T
+        return True
+
+
+    def get_pose_data(self) -> Dict:
+        """Gets the pose data for all frames in the set as a dictionary of arrays. The keys in the dictionary will be
+        [pos_x, pos_y, pos_z, quat_w, quat_x, quat_y, quat_z]. Frames without a pose are NaN.
+
+        Returns:
+            Dict: the pose data as a dictionary of (N,) arrays.
+        """
+        quats = r2q_batch(self.poses[:, :3, :3])
+
+        data = {}
+        data['pos_x'] = self.poses[:, 0, 3]
+        data['pos_y'] = self.poses[:, 1, 3]
+        data['pos_z'] = self.poses[:, 2, 3]
+        data['quat_w'] = quats[:, 0]
+        data['quat_x'] = quats[:, 1]
+        data['quat_y'] = quats[:, 2]
+        data['quat_z'] = quats[:, 3]
+
+        return data
+
+
+    def to_columns(self) -> Dict:
+        """Gets the set as a dictionary of columns. The keys in the dictionary will be
+        [frame_id, timestamp, pos_x, pos_y, pos_z, quat_w, quat_x, quat_y, quat_z, filepath].
+
+        Returns:
+            Dict: the columns as (N,) arrays.
+        """
+        data = {'frame_id': self.frame_ids, 'timestamp': self.timestamps}
+        data.update(self.get_pose_data())
+        data['filepath'] = self.filepaths
+        return data
+
+
+    def to_arrow(self) -> 'pyarrow.Table':
+        """Gets the set as a PyArrow table, see :meth:`to_columns` for the columns. The table can be written
+        using pyarrow.csv.write_csv or pyarrow.parquet.write_table. Requires PyArrow to be installed.
+
+        Returns:
+            pyarrow.Table: the table. Frames without a timestamp, pose or file are null.
+        """
+        import pyarrow as pa
+
+        table = {}
+        for name, column in self.to_columns().items():
+            if name == 'filepath':
+                table[name] = pa.array(column.tolist(), type=pa.string())
+            else:
+                table[name] = pa.array(column, from_pandas=True) # NaN is stored as null
+        return pa.table(table)
+
+
+    def to_pandas(self) -> 'pandas.DataFrame':
+        """Gets the set as a Pandas data frame, see :meth:`to_columns` for the columns. Requires Pandas to be installed.
+
+        Returns:
+            pandas.DataFrame: the data frame. Frames without a timestamp or pose are NaN, and frames without a file are None.
+        """
+        import pandas as pd
+        return pd.DataFrame(self.to_columns())
 
 ########################
 ### PUBLIC FUNCTIONS ###
@@ -366,3 +759,87 @@ class RoboFramePointCloud(RoboFrameFile):
 #########################
 ### PRIVATE FUNCTIONS ###
 #########################
+
+def pose_matrix(**kwargs) -> np.ndarray:
+    """Builds a homogeneous transform from a set of pose keyword arguments. The translational and rotational
+    parts are independent, a part that is not provided is set to the default (zero translation or no rotation).
+
+    Args:
+        **kwargs: the pose components, see :meth:`.RoboFrame.set_pose`.
+
+    Returns:
+        np.ndarray: the 4x4 homogeneous transform, or None if neither the translational or rotational part was provided.
+    """
+    has_pos = PoseComponents.POS_ONLY <= kwargs.keys()
+    has_rot = PoseComponents.ROT_ONLY <= kwargs.keys()
+    if not (has_pos or has_rot):
+        return None
+
+    T = np.eye(4)
+    if has_pos:
+        T[:3, 3] = [kwargs[x] for x in PoseComponents.POS_ORDER]
+    if has_rot:
+        import spatialmath as sm
+        T[:3, :3] = sm.base.q2r([kwargs[x] for x in PoseComponents.ROT_ORDER])
+    return T
+
+
+def frame_id_from_filename(filename: str) -> int:
+    """Gets the frame ID from a filename of the form '<prefix>_<user_notes>_<frame_id>.<extension>'.
+
+    Args:
+        filename (str): the filename, without the path.
+
+    Raises:
+        ValueError: if the frame ID is not an integer.
+
+    Returns:
+        int: the frame ID.
+    """
+    return int(filename.rsplit('_', 1)[-1].split('.')[0])
+
+
+@lru_cache(maxsize=256)
+def lowercase_fields(fields: Tuple[str]) -> Tuple[str]:
+    """Converts a tuple of field names to lowercase. The result is cached as the same fields (e.g., the
+    header of a CSV file) are typically added to many frames.
+
+    Args:
+        fields (Tuple[str]): the field names.
+
+    Returns:
+        Tuple[str]: the lowercase field names.
+    """
+    return tuple([fld.lower() for fld in fields])
+
+
+def reduce_schema_frame(frame: RoboFrame) -> Tuple:
+    """Pickles a frame created from a subclass returned by :meth:`.RoboFrame.from_schema`. The subclass can not
+    be found by name when unpickling, so it is recreated from the original class and the field names instead.
+
+    Args:
+        frame (RoboFrame): the frame to pickle.
+
+    Returns:
+        Tuple: the function and arguments to recreate the frame, and the frame's state as (__dict__, slots).
+    """
+    slots = {}
+    for cls in type(frame).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            if name not in ('__dict__', '__weakref__') and hasattr(frame, name):
+                slots[name] = getattr(frame, name)
+    base, names = type(frame)._SCHEMA
+    return (new_schema_frame, (base, names), (frame.__dict__ or None, slots))
+
+
+def new_schema_frame(base: type, names: Tuple[str]) -> RoboFrame:
+    """Creates an uninitialised frame of the schema subclass of a class, used when unpickling.
+
+    Args:
+        base (type): the class the schema subclass was created from.
+        names (Tuple[str]): the field names of the schema.
+
+    Returns:
+        RoboFrame: the uninitialised frame.
+    """
+    return object.__new__(base.from_schema(names))
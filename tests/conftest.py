@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+##################################################################################
+# MIT License                                                                    #
+#                                                                                #
+# Copyright (c) 2022 James Mount                                                 #
+#                                                                                #
+# Permission is hereby granted, free of charge, to any person obtaining a copy   #
+# of this software and associated documentation files (the "Software"), to deal  #
+# in the Software without restriction, including without limitation the rights   #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell      #
+# copies of the Software, and to permit persons to whom the Software is          #
+# furnished to do so, subject to the following conditions:                       #
+#                                                                                #
+# The above copyright notice and this permission notice shall be included in all #
+# copies or substantial portions of the Software.                                #
+#                                                                                #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR     #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,       #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE    #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER         #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,  #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE  #
+# SOFTWARE.                                                                      #
+##################################################################################
+
+###############
+### MODULES ###
+###############
+
+import pytest
+
+import pathlib
+import numpy as np
+
+import cv2
+from PIL import Image
+
+SCRIPT_DIR = pathlib.Path(__file__).parent
+
+################
+### FIXTURES ###
+################
+
+# Open3D and spatialmath are slow to import, so they are only imported by the tests that request them
+
+@pytest.fixture(scope="session")
+def o3d():
+    return pytest.importorskip("open3d")
+
+@pytest.fixture(scope="session")
+def sm():
+    return pytest.importorskip("spatialmath")
+
+# Paths to the test data shared by the file_utils and roboframes tests
+
+@pytest.fixture(scope="session")
+def starry_path():
+    return SCRIPT_DIR / "data" / "starry_night_01.jpg"
+
+@pytest.fixture(scope="session")
+def fragment_path():
+    return SCRIPT_DIR / "data" / "fragment_01.ply"
+
+# The baseline data is decoded once per test session and shared between tests. Tests must not modify it
+
+@pytest.fixture(scope="session")
+def starry_cv_color(starry_path):
+    return cv2.imread(str(starry_path), cv2.IMREAD_COLOR)
+
+# Decoded separately, as cvtColor on the colour image differs from the grayscale JPEG decode
+@pytest.fixture(scope="session")
+def starry_cv_gray(starry_path):
+    return cv2.imread(str(starry_path), cv2.IMREAD_GRAYSCALE)
+
+@pytest.fixture(scope="session")
+def starry_pil_color(starry_path):
+    img = Image.open(str(starry_path))
+    img.load()
+    return img
+
+@pytest.fixture(scope="session")
+def starry_pil_gray(starry_pil_color):
+    return starry_pil_color.convert("L")
+
+@pytest.fixture(scope="session")
+def fragment_arrays(o3d, fragment_path):
+    pcd = o3d.io.read_point_cloud(str(fragment_path))
+    return np.array(pcd.points), np.array(pcd.colors)
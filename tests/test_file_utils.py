@@ -30,18 +30,18 @@
 
 import pytest
 
-import os
+import time
 import pathlib
 import numpy as np
 
 import cv2
-import open3d as o3d
-from PIL import Image, ImageChops
+from PIL import Image
 
 from robotools.defines import FrameType
 from robotools.file_utils import *
+from robotools.roboframes import RoboFrameImage
 
-SCRIPT_DIR = pathlib.Path(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_DIR = pathlib.Path(__file__).parent
 
 ################################
 ### FILE UTIL FUNCTION TESTS ###
@@ -61,6 +61,19 @@ def test_extension_from_filepath_relative():
     filepath = "relative/001.png"
     assert extension_from_filepath(filepath) == "png"
 
+# Returns None when the file has no extension
+def test_extension_from_filepath_no_extension():
+    assert extension_from_filepath("/path/to/file/001") == None
+    assert extension_from_filepath("/path/to.dir/001") == None
+    assert extension_from_filepath("/path/to/file/.hidden") == None
+    assert extension_from_filepath("/path/to/file/") == None
+    assert extension_from_filepath("noextension") == None
+
+# Returns the extension with its original case
+def test_extension_from_filepath_case():
+    assert extension_from_filepath("/path/to/file/001.PNG") == "PNG"
+    assert extension_from_filepath(pathlib.Path("relative/file.tar.Gz")) == "Gz"
+
 
 # Testing frametype_from_extension function
 # Returns correct frame type for image extensions
@@ -78,9 +91,25 @@ def test_frametype_from_extension_csv_types():
     for _type in supported_csv_types():
         assert frametype_from_extension(_type) == FrameType.CSVDATA
 
+# Returns correct frame type regardless of the extension case
+def test_frametype_from_extension_case_insensitive():
+    assert frametype_from_extension("PNG") == FrameType.IMAGE
+    assert frametype_from_extension("Ply") == FrameType.POINTCLOUD
+    assert frametype_from_extension("CSV") == FrameType.CSVDATA
+
+# Repeated lookups of an extension are served from the cache and return the same frame type
+def test_frametype_from_extension_cached():
+    frametype_from_extension.cache_clear()
+    for _ in range(3):
+        assert frametype_from_extension("jpg") == FrameType.IMAGE
+        assert frametype_from_filepath("/path/to/file/frame_001.jpg") == FrameType.IMAGE
+    assert frametype_from_extension.cache_info().misses == 1
+    assert frametype_from_extension.cache_info().hits == 5
+
 # Returns correct frame type for unknown extensions
 def test_frametype_from_extension_unknown_types():
     assert frametype_from_extension("some-extension") == FrameType.UNKNOWN
+    assert frametype_from_extension(None) == FrameType.UNKNOWN
 
 
 # Testing frametype_from_filepath function
@@ -95,82 +124,314 @@ def test_frametype_from_filepath():
     filepath = "relative/001.png"
     assert frametype_from_filepath(filepath) == FrameType.IMAGE
 
+    filepath = pathlib.Path("/path/to/file/001.PCD")
+    assert frametype_from_filepath(filepath) == FrameType.POINTCLOUD
+
+    assert frametype_from_filepath("/path/to.dir/001") == FrameType.UNKNOWN
+    assert frametype_from_filepath("/path/to/file/.png") == FrameType.UNKNOWN
+
 
 # Testing read_image using OpenCV format
-def test_read_image_opencv_colour():
-    filepath = SCRIPT_DIR / "data" / "starry_night_01.jpg"
-    img1 = read_image(filepath)
-    img2 = cv2.imread(str(filepath), cv2.IMREAD_COLOR)
-    assert (img1.shape == img2.shape and not(np.bitwise_xor(img1,img2).any())) == True
-
-def test_read_image_opencv_grayscale():
-    filepath = SCRIPT_DIR / "data" / "starry_night_01.jpg"
-    img1 = read_image(filepath, colour=False)
-    img2 = cv2.imread(str(filepath), cv2.IMREAD_GRAYSCALE)
-    assert (img1.shape == img2.shape and not(np.bitwise_xor(img1,img2).any())) == True
+def test_read_image_opencv_colour(starry_cv_color, starry_path):
+    img1 = read_image(starry_path)
+    img2 = starry_cv_color
+    assert img1.shape == img2.shape and img1.dtype == img2.dtype and img1.tobytes() == img2.tobytes()
 
-def test_read_image_opencv_auto_colour():
-    filepath = SCRIPT_DIR / "data" / "starry_night_01.jpg"
-    img1 = read_image(filepath, colour=None)
-    img2 = cv2.imread(str(filepath), cv2.IMREAD_COLOR)
-    assert (img1.shape == img2.shape and not(np.bitwise_xor(img1,img2).any())) == True
+def test_read_image_opencv_grayscale(starry_cv_gray, starry_path):
+    img1 = read_image(starry_path, colour=False)
+    img2 = starry_cv_gray
+    assert img1.shape == img2.shape and img1.dtype == img2.dtype and img1.tobytes() == img2.tobytes()
+
+def test_read_image_opencv_auto_colour(starry_cv_color, starry_path):
+    img1 = read_image(starry_path, colour=None)
+    img2 = starry_cv_color
+    assert img1.shape == img2.shape and img1.dtype == img2.dtype and img1.tobytes() == img2.tobytes()
 
 def test_read_image_opencv_auto_grayscale():
     filepath = SCRIPT_DIR / "data" / "starry_night_gray_01.jpg"
     img1 = read_image(filepath, colour=None)
     img2 = cv2.imread(str(filepath), cv2.IMREAD_GRAYSCALE)
-    assert (img1.shape == img2.shape and not(np.bitwise_xor(img1,img2).any())) == True
+    assert img1.shape == img2.shape and img1.dtype == img2.dtype and img1.tobytes() == img2.tobytes()
 
 # Testing read_image using PIL format
-def test_read_image_pil_colour():
-    filepath = SCRIPT_DIR / "data" / "starry_night_01.jpg"
-    img1 = read_image(filepath, ImageFormat.PIL)
-    img2 = Image.open(str(filepath))
-    assert (ImageChops.difference(img1, img2)).getbbox() == None
+def test_read_image_pil_colour(starry_pil_color, starry_path):
+    img1 = read_image(starry_path, ImageFormat.PIL)
+    img2 = starry_pil_color
+    assert img1.size == img2.size and img1.mode == img2.mode and img1.tobytes() == img2.tobytes()
 
-def test_read_image_pil_grayscale():
-    filepath = SCRIPT_DIR / "data" / "starry_night_01.jpg"
-    img1 = read_image(filepath, ImageFormat.PIL, colour=False)
-    img2 = Image.open(str(filepath)).convert("L")
-    assert (ImageChops.difference(img1, img2)).getbbox() == None
+def test_read_image_pil_grayscale(starry_pil_gray, starry_path):
+    img1 = read_image(starry_path, ImageFormat.PIL, colour=False)
+    img2 = starry_pil_gray
+    assert img1.size == img2.size and img1.mode == img2.mode and img1.tobytes() == img2.tobytes()
 
-def test_read_image_pil_auto_colour():
-    filepath = SCRIPT_DIR / "data" / "starry_night_01.jpg"
-    img1 = read_image(filepath, ImageFormat.PIL, colour=None)
-    img2 = Image.open(str(filepath))
-    assert (ImageChops.difference(img1, img2)).getbbox() == None
+def test_read_image_pil_auto_colour(starry_pil_color, starry_path):
+    img1 = read_image(starry_path, ImageFormat.PIL, colour=None)
+    img2 = starry_pil_color
+    assert img1.size == img2.size and img1.mode == img2.mode and img1.tobytes() == img2.tobytes()
 
 def test_read_image_pil_auto_grayscale():
     filepath = SCRIPT_DIR / "data" / "starry_night_gray_01.jpg"
     img1 = read_image(filepath, ImageFormat.PIL, colour=None)
     img2 = Image.open(str(filepath))
-    assert (ImageChops.difference(img1, img2)).getbbox() == None
+    assert img1.size == img2.size and img1.mode == img2.mode and img1.tobytes() == img2.tobytes()
 
 # Test read_image
-def test_read_image():
-    filepath = SCRIPT_DIR / "data" / "starry_night_01.jpg"
-
-    img = read_image(filepath, image_format=ImageFormat.OPENCV)
+def test_read_image(starry_path):
+    img = read_image(starry_path, image_format=ImageFormat.OPENCV)
     assert type(img) == np.ndarray
     
-    img = read_image(filepath, image_format=ImageFormat.PIL)
+    img = read_image(starry_path, image_format=ImageFormat.PIL)
     assert type(img) != np.ndarray
 
     with pytest.raises(ValueError):
-        read_image(filepath, -1)
+        read_image(starry_path, -1)
+
+# Testing read_image with a reduce factor
+def test_read_image_reduce(starry_path):
+    filepath_str = str(starry_path)
+    img1 = read_image(starry_path, reduce=2)
+    img2 = cv2.imread(filepath_str, cv2.IMREAD_REDUCED_COLOR_2)
+    assert img1.shape == img2.shape and img1.dtype == img2.dtype and img1.tobytes() == img2.tobytes()
+
+    img1 = read_image(starry_path, colour=False, reduce=4)
+    img2 = cv2.imread(filepath_str, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    assert img1.shape == img2.shape and img1.dtype == img2.dtype and img1.tobytes() == img2.tobytes()
+
+    img = read_image(starry_path, ImageFormat.PIL, reduce=2)
+    img2 = Image.open(filepath_str)
+    assert img.size == ((img2.width + 1) // 2, (img2.height + 1) // 2)
+
+    with pytest.raises(ValueError):
+        read_image(starry_path, reduce=3)
+
+# Testing the PIL and OpenCV backends reduce images with sides not divisible by the reduce factor to the same size
+@pytest.mark.parametrize("ext", ["jpg", "png"])
+@pytest.mark.parametrize("reduce", [2, 4, 8])
+def test_read_image_reduce_odd_size(tmp_path, ext, reduce):
+    filepath = tmp_path / ("odd.%s"%(ext))
+    cv2.imwrite(str(filepath), np.random.default_rng(0).integers(0, 256, (101, 203, 3), dtype=np.uint8))
+
+    img1 = read_image(filepath, ImageFormat.PIL, reduce=reduce)
+    img2 = read_image(filepath, ImageFormat.OPENCV, reduce=reduce)
+    assert img1.size == (img2.shape[1], img2.shape[0])
+    if ext == "jpg":
+        assert img1.size == ((203 + reduce - 1) // reduce, (101 + reduce - 1) // reduce)
+    else:
+        assert img1.size == (203 // reduce, 101 // reduce)
+
+# Testing read_image with a crop box
+def test_read_image_box(starry_path):
+    filepath_str = str(starry_path)
+    box = (100, 50, 300, 250)
+
+    img1 = read_image(starry_path, box=box)
+    img2 = cv2.imread(filepath_str, cv2.IMREAD_COLOR)[50:250, 100:300]
+    assert img1.shape == img2.shape and img1.dtype == img2.dtype and img1.tobytes() == img2.tobytes()
+
+    img1 = read_image(starry_path, ImageFormat.PIL, colour=False, box=box)
+    img2 = Image.open(filepath_str).convert("L").crop(box)
+    assert img1.size == img2.size and img1.mode == img2.mode and img1.tobytes() == img2.tobytes()
+
+# Testing read_image_into
+def test_read_image_into(starry_path):
+    img2 = cv2.imread(str(starry_path), cv2.IMREAD_COLOR)
+
+    out = np.zeros((2,) + img2.shape, dtype=np.uint8)
+    view = out[1]
+    img1 = read_image_into(starry_path, view)
+    assert img1 is view
+    assert out[1].shape == img2.shape and out[1].dtype == img2.dtype and out[1].tobytes() == img2.tobytes()
+    assert not out[0].any()
+
+    with pytest.raises(ValueError):
+        read_image_into(starry_path, np.zeros((10, 10, 3), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        read_image_into(starry_path, out[1], colour=None)
+
+# Testing read_image_into raises, rather than returning the untouched output array, when the file can not be read
+def test_read_image_into_missing(tmp_path):
+    out = np.full((10, 10), 7, dtype=np.uint8)
+    with pytest.raises(ValueError):
+        read_image_into(tmp_path / "missing.png", out)
+
+    filepath = tmp_path / "corrupt.png"
+    filepath.write_bytes(b"not an image")
+    with pytest.raises(ValueError):
+        read_image_into(filepath, out)
+
+# Testing read_image_turbojpeg, falls back to OpenCV when TurboJPEG is not available
+@pytest.mark.parametrize("reduce", [1, 2, 4, 8])
+@pytest.mark.parametrize("colour", [True, False])
+def test_read_image_turbojpeg(starry_path, colour, reduce):
+    img1 = read_image_turbojpeg(starry_path, colour=colour, reduce=reduce)
+    if reduce == 1:
+        flag = cv2.IMREAD_COLOR if colour else cv2.IMREAD_GRAYSCALE
+    else:
+        flag = getattr(cv2, "IMREAD_REDUCED_%s_%d"%("COLOR" if colour else "GRAYSCALE", reduce))
+    img2 = cv2.imread(str(starry_path), flag)
+    assert img1.shape == img2.shape and img1.dtype == img2.dtype
+
+    # Allow for small IDCT differences between libjpeg-turbo builds, a swapped channel order or bad decode differs far more
+    assert np.abs(img1.astype(np.int16) - img2).mean() < 1.0
+
+# Testing read_images_torch, decoding on the CPU so a GPU is not required
+def test_read_images_torch(starry_path):
+    pytest.importorskip("torchvision")
+    filepaths = [starry_path, SCRIPT_DIR / "data" / "starry_night_gray_01.jpg"]
+    imgs = read_images_torch(filepaths, device='cpu')
+    assert len(imgs) == 2
+    for filepath, img in zip(filepaths, imgs):
+        assert tuple(img.shape) == (3,) + cv2.imread(str(filepath), cv2.IMREAD_COLOR).shape[:2]
+
+    img = read_image_torch(filepaths[0], colour=False, device='cpu')
+    assert tuple(img.shape) == (1,) + cv2.imread(str(filepaths[0]), cv2.IMREAD_GRAYSCALE).shape
+
+# Testing read_image_mmap
+def test_read_image_mmap(tmp_path, starry_path):
+    img = cv2.imread(str(starry_path), cv2.IMREAD_COLOR)[:64, :96]
+
+    cv2.imwrite(str(tmp_path / "img_01.ppm"), img)
+    img1 = read_image_mmap(tmp_path / "img_01.ppm")
+    assert isinstance(img1, np.memmap)
+    assert np.array_equal(img1, img[:, :, ::-1])
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    cv2.imwrite(str(tmp_path / "img_01.pgm"), gray)
+    img1 = read_image_mmap(tmp_path / "img_01.pgm")
+    assert isinstance(img1, np.memmap)
+    assert np.array_equal(img1, gray)
+
+    with pytest.raises(ValueError):
+        read_image_mmap(starry_path)
+
+def test_read_image_mmap_tiff(tmp_path, starry_path):
+    tifffile = pytest.importorskip("tifffile")
+    img = cv2.imread(str(starry_path), cv2.IMREAD_COLOR)[:64, :96]
+
+    tifffile.imwrite(str(tmp_path / "img_01.tif"), img)
+    img1 = read_image_mmap(tmp_path / "img_01.tif")
+    assert isinstance(img1, np.memmap)
+    assert np.array_equal(img1, img)
+
+# Testing is_single_channel reads the channel count from the image header
+def test_is_single_channel(tmp_path, starry_path):
+    assert is_single_channel(SCRIPT_DIR / "data" / "starry_night_gray_01.jpg") == True
+    assert is_single_channel(starry_path) == False
+    assert is_single_channel(SCRIPT_DIR / "data" / "fragment_01.ply") == False
+
+    img = cv2.imread(str(starry_path), cv2.IMREAD_COLOR)[:64, :96]
+    for ext in ["png", "tif"]:
+        cv2.imwrite(str(tmp_path / ("colour.%s"%(ext))), img)
+        cv2.imwrite(str(tmp_path / ("gray.%s"%(ext))), cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+        assert is_single_channel(tmp_path / ("colour.%s"%(ext))) == False
+        assert is_single_channel(tmp_path / ("gray.%s"%(ext))) == True
+        assert np.array_equal(read_image(tmp_path / ("gray.%s"%(ext)), colour=None), cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+
+# Testing read_image_shape
+def test_read_image_shape():
+    for filename in ["starry_night_01.jpg", "starry_night_gray_01.jpg"]:
+        filepath = SCRIPT_DIR / "data" / filename
+        img = cv2.imread(str(filepath), cv2.IMREAD_UNCHANGED)
+        assert read_image_shape(filepath) == img.shape[:2]
 
 # Testing read_pointcloud
-def test_read_pointcloud():
-    filepath = SCRIPT_DIR / "data" / "fragment_01.ply"
+def test_read_pointcloud(fragment_arrays, fragment_path):
+    pcd1 = read_pointcloud(fragment_path)
+    pts, col = fragment_arrays
+
+    assert np.array_equal(np.asarray(pcd1.points), pts)
+    assert np.array_equal(np.asarray(pcd1.colors), col)
+
+
+# Testing read_pointcloud with an ASCII PCD file
+def test_read_pointcloud_ascii_pcd(tmp_path, o3d, fragment_path):
+    pcd = o3d.io.read_point_cloud(str(fragment_path))
+    pcd.colors = o3d.utility.Vector3dVector(np.random.default_rng(0).integers(0, 256, (len(pcd.points), 3)) / 255.0)
+    filepath = tmp_path / "fragment_01.pcd"
+    o3d.io.write_point_cloud(str(filepath), pcd, write_ascii=True)
+
     pcd1 = read_pointcloud(filepath)
     pcd2 = o3d.io.read_point_cloud(str(filepath))
+    assert np.array_equal(np.asarray(pcd1.points), np.asarray(pcd2.points))
+    assert np.array_equal(np.asarray(pcd1.colors), np.asarray(pcd2.colors))
+    assert np.array_equal(np.asarray(pcd1.normals), np.asarray(pcd2.normals))
+
+# Testing read_pointcloud falls back to Open3D for an ASCII PCD file whose header the Numpy parser rejects
+def test_read_pointcloud_ascii_pcd_fallback(tmp_path, o3d):
+    pcd = o3d.geometry.PointCloud()
+    pcd.points = o3d.utility.Vector3dVector(np.arange(12, dtype=np.float64).reshape(4, 3))
+    filepath = tmp_path / "points.pcd"
+    o3d.io.write_point_cloud(str(filepath), pcd, write_ascii=True)
+
+    # Open3D does not require the SIZE and TYPE entries
+    lines = filepath.read_text().splitlines()
+    filepath.write_text("\n".join([x for x in lines if not x.startswith(("SIZE", "TYPE"))]) + "\n")
+
+    pcd1 = read_pointcloud(filepath)
+    assert np.array_equal(np.asarray(pcd1.points), np.asarray(pcd.points))
+
+# Testing read_pointcloud using the tensor API
+def test_read_pointcloud_tensor(o3d, fragment_path):
+    pcd1 = read_pointcloud(fragment_path, tensor=True)
+    pcd2 = o3d.io.read_point_cloud(str(fragment_path))
+
+    assert isinstance(pcd1, o3d.t.geometry.PointCloud)
+    assert np.array_equal(pcd1.point.positions.numpy(), np.asarray(pcd2.points))
 
-    pcd1_pts = np.asarray(pcd1.points)
-    pcd1_col = np.asarray(pcd1.colors)
-    pcd2_pts = np.asarray(pcd2.points)
-    pcd2_col = np.asarray(pcd2.colors)
-    assert np.sum(pcd1_pts - pcd2_pts) == 0
-    assert np.sum(pcd1_col - pcd2_col) == 0
+
+# Testing read_pointcloud_mmap
+def test_read_pointcloud_mmap(tmp_path, o3d, fragment_path):
+    pcd2 = o3d.io.read_point_cloud(str(fragment_path))
+    o3d.io.write_point_cloud(str(tmp_path / "fragment_01.pcd"), pcd2)
+
+    for pcd1 in [read_pointcloud_mmap(fragment_path), read_pointcloud_mmap(tmp_path / "fragment_01.pcd")]:
+        assert np.array_equal(np.asarray(pcd1.points), np.asarray(pcd2.points))
+        assert np.array_equal(np.asarray(pcd1.colors), np.asarray(pcd2.colors))
+        assert np.array_equal(np.asarray(pcd1.normals), np.asarray(pcd2.normals))
+
+    with pytest.raises(ValueError):
+        read_pointcloud_mmap(SCRIPT_DIR / "data" / "starry_night_01.jpg")
+
+
+# Testing read_many
+def test_read_many(starry_path):
+    filepaths = [starry_path, SCRIPT_DIR / "data" / "starry_night_gray_01.jpg"]
+    frames = [RoboFrameImage(filepath) for filepath in filepaths]
+
+    imgs = read_many(frames, workers=2, colour=False)
+    assert len(imgs) == 2
+    for filepath, img1 in zip(filepaths, imgs):
+        img2 = cv2.imread(str(filepath), cv2.IMREAD_GRAYSCALE)
+        assert img1.shape == img2.shape and img1.dtype == img2.dtype and img1.tobytes() == img2.tobytes()
+
+
+# Testing iread_many
+def test_iread_many(starry_path):
+    filepaths = [starry_path, SCRIPT_DIR / "data" / "starry_night_gray_01.jpg"] * 3
+    frames = [RoboFrameImage(filepath) for filepath in filepaths]
+
+    imgs = iread_many(frames, workers=2, window=2, colour=False)
+    assert not isinstance(imgs, list)
+    imgs = list(imgs)
+    assert len(imgs) == 6
+    for filepath, img1 in zip(filepaths, imgs):
+        assert np.array_equal(img1, cv2.imread(str(filepath), cv2.IMREAD_GRAYSCALE))
+
+    with pytest.raises(ValueError):
+        next(iread_many(frames, window=0))
+
+# Testing iread_many cancels the queued reads when the consumer stops early
+def test_iread_many_stop_early():
+    class SlowFrame():
+        reads = 0
+        def read(self):
+            time.sleep(0.05)
+            SlowFrame.reads += 1
+
+    imgs = iread_many([SlowFrame() for _ in range(20)], workers=1, window=8)
+    next(imgs)
+    imgs.close()
+    assert SlowFrame.reads <= 2
 
 
 # Testing for get_files()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+##################################################################################
+# MIT License                                                                    #
+#                                                                                #
+# Copyright (c) 2022 James Mount                                                 #
+#                                                                                #
+# Permission is hereby granted, free of charge, to any person obtaining a copy   #
+# of this software and associated documentation files (the "Software"), to deal  #
+# in the Software without restriction, including without limitation the rights   #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell      #
+# copies of the Software, and to permit persons to whom the Software is          #
+# furnished to do so, subject to the following conditions:                       #
+#                                                                                #
+# The above copyright notice and this permission notice shall be included in all #
+# copies or substantial portions of the Software.                                #
+#                                                                                #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR     #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,       #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE    #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER         #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,  #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE  #
+# SOFTWARE.                                                                      #
+##################################################################################
+
+###############
+### MODULES ###
+###############
+
+import pytest
+
+import numpy as np
+
+from robotools.pose_utils import *
+
+################################
+### POSE UTIL FUNCTION TESTS ###
+################################
+
+# Testing r2q_batch matches the Spatial Maths r2q function, including rotations where each component is the largest
+def test_r2q_batch(sm):
+    rots = [sm.SO3(), sm.SO3.Rx(np.pi), sm.SO3.Ry(np.pi), sm.SO3.Rz(np.pi), sm.SO3.Rx(-np.pi/2)]
+    rots += [sm.SO3.Rand() for _ in range(100)]
+    R = np.stack([x.A for x in rots])
+
+    quats = r2q_batch(R)
+    assert quats.shape == (len(rots), 4)
+    for idx, rot in enumerate(rots):
+        assert np.allclose(quats[idx], sm.base.r2q(rot.A), rtol=0, atol=1e-15)
+
+# Testing r2q_batch with no rotations
+def test_r2q_batch_empty():
+    assert r2q_batch(np.empty((0, 3, 3))).shape == (0, 4)
+
+# Testing r2q_scalar matches the Spatial Maths r2q function, including rotations where each component is the largest
+def test_r2q_scalar(sm):
+    rots = [sm.SO3(), sm.SO3.Rx(np.pi), sm.SO3.Ry(np.pi), sm.SO3.Rz(np.pi), sm.SO3.Rx(-np.pi/2)]
+    rots += [sm.SO3.Rand() for _ in range(100)]
+
+    for rot in rots:
+        assert np.array_equal(r2q_scalar(rot.A), sm.base.r2q(rot.A))
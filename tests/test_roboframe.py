@@ -30,18 +30,23 @@
 
 import pytest
 
-import os
+import sys
+import pickle
 import pathlib
+import subprocess
+import weakref
 import numpy as np
+from operator import attrgetter
 
 import cv2
-import open3d as o3d
-import spatialmath as sm
-from PIL import Image, ImageChops
+from PIL import Image
 
 from robotools.roboframes import *
 
-SCRIPT_DIR = pathlib.Path(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_DIR = pathlib.Path(__file__).parent
+
+# Root directory of the made up filepaths in the filename tests, these never touch the filesystem
+ROOT = pathlib.PurePath("/path/to/file")
 
 
 ###################################
@@ -59,30 +64,102 @@ def test_roboframe_class_add_data():
     frame.add_data('test_0', 1)
 
     assert frame.test_0 == 1
-    assert frame.has_field('test_0') == True
-    assert frame.has_field('test_1') == False
+    assert frame.has_field('test_0')
+    assert not frame.has_field('test_1')
 
     frame.add_data(['test_2', 'test_3'], ['string', 10.1])
-    assert frame.test_2 == 'string'
-    assert frame.test_3 == 10.1
+    assert attrgetter('test_2', 'test_3')(frame) == ('string', 10.1)
+
+    frame.add_data(('Timestamp', 'Test_Upper'), (10.5, 1))
+    assert attrgetter('timestamp', 'test_upper')(frame) == (10.5, 1)
 
     frame.add_data(['test_4'], 'string')
     frame.add_data('test_5', [10])
-    assert frame.test_4 == 'string'
-    assert frame.test_5 == 10
+    assert attrgetter('test_4', 'test_5')(frame) == ('string', 10)
 
-    with pytest.raises(ValueError):
+    with pytest.raises(ValueError, match="number of fields and values"):
         frame.add_data(['test_6', 'test_7'], [10])
+    with pytest.raises(ValueError, match="number of fields and values"):
         frame.add_data('test_8', ['string', 10])
+    assert not frame.has_field('test_6')
+    assert not frame.has_field('test_8')
+
+    frame.add_data('Test_9', ('string',))
+    assert frame.test_9 == 'string'
 
 
+# Test the standard attributes are stored in slots, the instance dictionary only holds added data
+def test_roboframe_class_slots(starry_path):
+    frame = RoboFrame(1, 10.1)
+    assert vars(frame) == {}
+
+    frame.add_data('test_0', 1)
+    assert vars(frame) == {'test_0': 1}
+
+    frame = RoboFrameImage(starry_path)
+    assert vars(frame) == {}
+    assert weakref.ref(frame)() is frame
+
+# Test fields in the schema are stored in slots, and the subclass is cached
+def test_roboframe_class_from_schema(starry_path):
+    cls = RoboFrame.from_schema(['Speed', 'gps-fix', 'timestamp'])
+    assert cls is RoboFrame.from_schema(['timestamp', 'speed', 'gps-fix'])
+    assert issubclass(cls, RoboFrame)
+    assert cls.__slots__ == ('speed',)
+
+    frame = cls(1)
+    frame.add_data(['Speed', 'gps-fix', 'Timestamp'], [1.5, True, 10.5])
+    assert attrgetter('speed', 'timestamp')(frame) == (1.5, 10.5)
+    assert vars(frame) == {'gps-fix': True}
+
+    cls = RoboFrameImage.from_schema(['exposure', 'filepath'])
+    assert cls.__slots__ == ('exposure',)
+    frame = cls(starry_path)
+    frame.add_data('exposure', 0.01)
+    assert frame.exposure == 0.01
+    assert vars(frame) == {}
+    assert frame.read().shape == cv2.imread(str(starry_path)).shape
+
+# Test extending a schema, and that fields passed as given are written to the slots
+def test_roboframe_class_from_schema_extend():
+    cls = RoboFrame.from_schema(['Speed']).from_schema(['Heading'])
+    assert cls is RoboFrame.from_schema(['speed', 'heading']) and cls.__bases__ == (RoboFrame,)
+
+    frame = cls(1)
+    frame.add_data('Heading', 0.5)
+    frame.add_data(('Speed', 'other'), (1.5, 2))
+    assert frame.heading == 0.5
+    assert frame.speed == 1.5
+    assert vars(frame) == {'other': 2}
+
+# Test frames created from a schema subclass can be pickled, e.g. for multiprocessing workers
+def test_roboframe_class_from_schema_pickle(starry_path):
+    frame = RoboFrame.from_schema(['Speed', 'gps-fix'])(1, 10.5)
+    frame.add_data(['Speed', 'gps-fix'], [1.5, True])
+    copy = pickle.loads(pickle.dumps(frame))
+    assert type(copy) is type(frame)
+    assert copy.frame_id == 1
+    assert copy.timestamp == 10.5
+    assert copy.speed == 1.5
+    assert vars(copy) == {'gps-fix': True}
+
+    frame = RoboFrameImage.from_schema(['exposure'])(starry_path)
+    frame.add_data('exposure', 0.01)
+    copy = pickle.loads(pickle.dumps(frame))
+    assert type(copy) is type(frame)
+    assert copy.exposure == 0.01
+    assert copy.filepath == starry_path
+    assert copy.read().shape == frame.read().shape
+
 # Test set_pose and get_pose_data
-def test_roboframe_class_timestamp():
+def test_roboframe_class_timestamp(sm):
     frame = RoboFrame(1)
 
     assert frame.get_pose_data() == None
     frame.pose = 10.1
     assert frame.get_pose_data() == None
+    frame.pose = sm.SO3()
+    assert frame.get_pose_data() == None
 
     frame.pose = sm.SE3()
     data = frame.get_pose_data()
@@ -126,6 +203,18 @@ def test_roboframe_class_timestamp():
     assert data['quat_y'] == 1
     assert data['quat_z'] == 0
 
+# Extra keyword arguments are ignored when setting the pose
+def test_roboframe_class_set_pose_extra_kwargs():
+    frame = RoboFrame(1)
+    assert frame.set_pose(timestamp=1.0, pos_x=1, pos_y=2, pos_z=3) == True
+    assert [frame.get_pose_data()[x] for x in PoseComponents.FULL_ORDER] == [1, 2, 3, 1, 0, 0, 0]
+
+# Importing the module should not import Open3D or Spatial Maths, they are imported on first use
+def test_roboframes_lazy_imports():
+    code = "import sys, robotools.roboframes; print('open3d' in sys.modules, 'spatialmath' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=SCRIPT_DIR.parent, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False False"
+
 
 ###################################
 ### ROBOFRAME FILE CLASS TESTS ###
@@ -151,171 +240,266 @@ def test_constructor_simple():
     frame = DummyRoboFrameFile("/path/to/file/001.png")
 
     assert frame.frame_id == 1
-    assert frame.filepath == pathlib.Path("/path/to/file/001.png")
+    assert frame.filepath == ROOT / "001.png"
 
 # TESTING FILENAME PROPERTIES
-# Testing filepath with the form <id-number>.<extension> returns correct properties
-def test_file_properties_id_with_extension():
-    frame = DummyRoboFrameFile("/path/to/file/001.png")
+# Testing filepaths of the forms <id-number>, <prefix>_<id-number> and <prefix>_<user-notes>_<id-number>, with and
+# without an extension, return the correct properties. The complex cases have user notes that include underscores
+@pytest.mark.parametrize("filepath, filestem, filename, extension, prefix, user_notes", [
+    ("/path/to/file/001.png", "001", "001.png", "png", None, None),
+    ("/path/to/file/001", "001", "001", None, None, None),
+    ("/path/to/file/frame_001.png", "frame_001", "frame_001.png", "png", "frame", None),
+    ("/path/to/file/frame_001", "frame_001", "frame_001", None, "frame", None),
+    ("/path/to/file/frame_user-notes_001.png", "frame_user-notes_001", "frame_user-notes_001.png", "png", "frame", "user-notes"),
+    ("/path/to/file/frame_user-notes_001", "frame_user-notes_001", "frame_user-notes_001", None, "frame", "user-notes"),
+    ("/path/to/file/frame_user_notes_001.png", "frame_user_notes_001", "frame_user_notes_001.png", "png", "frame", "user_notes"),
+    ("/path/to/file/frame_user_notes_001", "frame_user_notes_001", "frame_user_notes_001", None, "frame", "user_notes"),
+])
+def test_file_properties(filepath, filestem, filename, extension, prefix, user_notes):
+    frame = DummyRoboFrameFile(filepath)
 
     assert frame.frame_id == 1
-    assert frame.filestem == "001"
-    assert frame.filename == "001.png"
-    assert frame.rootpath == pathlib.Path("/path/to/file")
-    assert frame.extension == "png"
-    assert frame.prefix == None
-    assert frame.user_notes == None
+    assert frame.filestem == filestem
+    assert frame.filename == filename
+    assert frame.rootpath == ROOT
+    assert frame.extension == extension
+    assert frame.prefix == prefix
+    assert frame.user_notes == user_notes
 
 
-# Testing filepath with the form <id-number> returns correct properties
-def test_file_properties_id_without_extension():
-    frame = DummyRoboFrameFile("/path/to/file/001")
-
-    assert frame.frame_id == 1
-    assert frame.filestem == "001"
-    assert frame.filename == "001"
-    assert frame.rootpath == pathlib.Path("/path/to/file")
-    assert frame.extension == None
-    assert frame.prefix == None
-    assert frame.user_notes == None
-
-
-# Testing filepath with the form <prefix>_<id-number>.<extension> returns correct properties
-def test_file_properties_prefix_id_with_extension():
-    frame = DummyRoboFrameFile("/path/to/file/frame_001.png")
-
-    assert frame.frame_id == 1
-    assert frame.filestem == "frame_001"
-    assert frame.filename == "frame_001.png"
-    assert frame.rootpath == pathlib.Path("/path/to/file")
-    assert frame.extension == "png"
-    assert frame.prefix == "frame"
-    assert frame.user_notes == None
-
-
-# Testing filepath with the form <prefix>_<id-number> returns correct properties
-def test_file_properties_prefix_id_without_extension():
-    frame = DummyRoboFrameFile("/path/to/file/frame_001")
-
-    assert frame.frame_id == 1
-    assert frame.filestem == "frame_001"
-    assert frame.filename == "frame_001"
-    assert frame.rootpath == pathlib.Path("/path/to/file")
-    assert frame.extension == None
-    assert frame.prefix == "frame"
-    assert frame.user_notes == None
-
-
-# Testing filepath with the form <prefix>_<user-notes>_<id-number>.<extension> returns correct properties
-def test_file_properties_prefix_usernotes_id_with_extension_simple():
-    frame = DummyRoboFrameFile("/path/to/file/frame_user-notes_001.png")
+# Testing that setting the filepath updates the cached filename properties
+def test_file_properties_update_filepath():
+    frame = DummyRoboFrameFile("/path/to/file/001.png")
+    frame.filepath = "/other/path/frame_user_notes_002.ply"
 
     assert frame.frame_id == 1
-    assert frame.filestem == "frame_user-notes_001"
-    assert frame.filename == "frame_user-notes_001.png"
-    assert frame.rootpath == pathlib.Path("/path/to/file")
-    assert frame.extension == "png"
+    assert frame.filepath == pathlib.PurePath("/other/path/frame_user_notes_002.ply")
+    assert frame.filestem == "frame_user_notes_002"
+    assert frame.filename == "frame_user_notes_002.ply"
+    assert frame.rootpath == pathlib.PurePath("/other/path")
+    assert frame.extension == "ply"
     assert frame.prefix == "frame"
-    assert frame.user_notes == "user-notes"
+    assert frame.user_notes == "user_notes"
 
 
-# Testing filepath with the form <prefix>_<user-notes>_<id-number> returns correct properties
-def test_file_properties_prefix_usernotes_id_without_extension_simple():
-    frame = DummyRoboFrameFile("/path/to/file/frame_user-notes_001")
+###################################
+### ROBOFRAME IMAGE CLASS TESTS ###
+###################################
 
-    assert frame.frame_id == 1
-    assert frame.filestem == "frame_user-notes_001"
-    assert frame.filename == "frame_user-notes_001"
-    assert frame.rootpath == pathlib.Path("/path/to/file")
-    assert frame.extension == None
-    assert frame.prefix == "frame"
-    assert frame.user_notes == "user-notes"
+def test_roboframe_image_constructor():
+    with pytest.raises(ValueError):
+        frame = RoboFrameImage("/path/to/file/frame_user_notes_001.ply")
 
+    frame = RoboFrameImage("/path/to/file/frame_user_notes_001.PNG")
+    assert frame.extension == "PNG"
 
-# Testing filepath with the form <prefix>_<user-notes>_<id-number>.<extension> returns correct properties
-# when user notes includes underscores
-def test_file_properties_prefix_usernotes_id_with_extension_complex():
-    frame = DummyRoboFrameFile("/path/to/file/frame_user_notes_001.png")
 
-    assert frame.frame_id == 1
-    assert frame.filestem == "frame_user_notes_001"
-    assert frame.filename == "frame_user_notes_001.png"
-    assert frame.rootpath == pathlib.Path("/path/to/file")
-    assert frame.extension == "png"
-    assert frame.prefix == "frame"
-    assert frame.user_notes == "user_notes"
+@pytest.mark.parametrize("image_format", [ImageFormat.OPENCV, ImageFormat.PIL])
+def test_roboframe_image_read(image_format, starry_cv_color, starry_pil_color, starry_path):
+    frame = RoboFrameImage(starry_path)
 
+    img1 = frame.read(image_format=image_format)
+    if image_format == ImageFormat.OPENCV:
+        img2 = starry_cv_color
+        assert img1.shape == img2.shape and np.array_equal(img1, img2)
+    else:
+        img2 = starry_pil_color
+        assert img1.size == img2.size and img1.mode == img2.mode and img1.tobytes() == img2.tobytes()
 
-# Testing filepath with the form <prefix>_<user-notes>_<id-number> returns correct properties
-def test_file_properties_prefix_usernotes_id_without_extension_complex():
-    frame = DummyRoboFrameFile("/path/to/file/frame_user_notes_001")
 
-    assert frame.frame_id == 1
-    assert frame.filestem == "frame_user_notes_001"
-    assert frame.filename == "frame_user_notes_001"
-    assert frame.rootpath == pathlib.Path("/path/to/file")
-    assert frame.extension == None
-    assert frame.prefix == "frame"
-    assert frame.user_notes == "user_notes"
+# RoboFrameImage.read must return image data, never a point cloud
+def test_roboframe_image_read_type(o3d, starry_path):
+    frame = RoboFrameImage(starry_path)
+    assert isinstance(frame.read(image_format=ImageFormat.OPENCV), np.ndarray)
+    assert isinstance(frame.read(image_format=ImageFormat.PIL), Image.Image)
+    assert not isinstance(frame.read(), (o3d.geometry.PointCloud, o3d.t.geometry.PointCloud))
 
 
-###################################
-### ROBOFRAME IMAGE CLASS TESTS ###
-###################################
+@pytest.mark.parametrize("image_format", [ImageFormat.OPENCV, ImageFormat.PIL])
+def test_roboframe_image_read_grayscale(image_format, starry_cv_gray, starry_pil_gray, starry_path):
+    frame = RoboFrameImage(starry_path)
 
-def test_roboframe_image_constructor():
-    with pytest.raises(ValueError):
-        frame = RoboFrameImage("/path/to/file/frame_user_notes_001.ply")
+    img1 = frame.read(image_format=image_format, colour=False)
+    if image_format == ImageFormat.OPENCV:
+        img2 = starry_cv_gray
+        assert img1.shape == img2.shape and np.array_equal(img1, img2)
+    else:
+        img2 = starry_pil_gray
+        assert img1.size == img2.size and img1.mode == img2.mode and img1.tobytes() == img2.tobytes()
 
 
-def test_roboframe_image_read():
-    filepath = SCRIPT_DIR / "data/starry_night_01.jpg"
-    frame = RoboFrameImage(filepath)
 
-    for image_format in [ImageFormat.OPENCV, ImageFormat.PIL]:
-            img1 = frame.read(image_format=image_format)
-            if image_format == ImageFormat.OPENCV:
-                img2 = cv2.imread(str(filepath), cv2.IMREAD_COLOR)
-                assert (img1.shape == img2.shape and not(np.bitwise_xor(img1,img2).any())) == True
-            else:
-                img2 = Image.open(str(filepath))
-                assert (ImageChops.difference(img1, img2)).getbbox() == None
+def test_roboframe_image_shape(starry_path):
+    frame = RoboFrameImage(starry_path)
 
+    img = cv2.imread(str(starry_path), cv2.IMREAD_COLOR)
+    assert frame.shape() == img.shape[:2]
 
-def test_roboframe_image_read_grayscale():
-    filepath = SCRIPT_DIR / "data/starry_night_01.jpg"
-    frame = RoboFrameImage(filepath)
 
-    for image_format in [ImageFormat.OPENCV, ImageFormat.PIL]:
-            img1 = frame.read(image_format=image_format, colour=False)
-            if image_format == ImageFormat.OPENCV:
-                img2 = cv2.imread(str(filepath), cv2.IMREAD_GRAYSCALE)
-                assert (img1.shape == img2.shape and not(np.bitwise_xor(img1,img2).any())) == True
-            else:
-                img2 = Image.open(str(filepath)).convert("L")
-                assert (ImageChops.difference(img1, img2)).getbbox() == None
+def test_roboframe_image_prefetch(starry_path):
+    frame = RoboFrameImage(starry_path)
 
+    # Prefetching is only a hint, the frame should read as normal afterwards
+    assert frame.prefetch() is None
+    assert np.array_equal(frame.read(), cv2.imread(str(starry_path), cv2.IMREAD_COLOR))
 
 
-###################################
-### ROBOFRAME IMAGE CLASS TESTS ###
-###################################
+#########################################
+### ROBOFRAME POINT CLOUD CLASS TESTS ###
+#########################################
 
 def test_roboframe_pointcloud_constructor():
     with pytest.raises(ValueError):
         frame = RoboFramePointCloud("/path/to/file/frame_user_notes_001.png")
 
-def test_roboframe_pointcloud_read():
-    filepath = SCRIPT_DIR / "data/fragment_01.ply"
-
-    frame = RoboFramePointCloud(filepath)
+def test_roboframe_pointcloud_read(fragment_arrays, fragment_path):
+    frame = RoboFramePointCloud(fragment_path)
     pcd1 = frame.read()
+    pts, col = fragment_arrays
+
+    assert np.array_equal(np.asarray(pcd1.points), pts)
+    assert np.array_equal(np.asarray(pcd1.colors), col)
+
+
+def test_roboframe_pointcloud_read_tensor(o3d, fragment_path):
+    frame = RoboFramePointCloud(fragment_path)
+    pcd1 = frame.read(tensor=True, device='CPU:0')
+    pcd2 = o3d.io.read_point_cloud(str(fragment_path))
+
+    assert isinstance(pcd1, o3d.t.geometry.PointCloud)
+    assert pcd1.device == o3d.core.Device('CPU:0')
+    assert np.array_equal(pcd1.point.positions.numpy(), np.asarray(pcd2.points))
+
+#################################
+### ROBOFRAME SET CLASS TESTS ###
+#################################
+
+def test_roboframe_set_from_frames(sm, starry_path, fragment_path):
+    frames = [RoboFrame(1, 0.5, sm.SE3.Rx(0.3, t=[1, 2, 3])), RoboFrame(2),
+              RoboFrameImage(starry_path), RoboFramePointCloud(fragment_path)]
+    frames[2].frame_id = 3
+    frameset = RoboFrameSet.from_frames(frames)
+
+    assert len(frameset) == 4
+    assert np.array_equal(frameset.frame_ids, [1, 2, 3, 1])
+    assert frameset.timestamps[0] == 0.5 and np.isnan(frameset.timestamps[1:]).all()
+    assert np.array_equal(frameset.poses[0], frames[0].pose.A)
+    assert np.isnan(frameset.poses[1:]).all()
+    assert frameset.filepaths[0] is None and frameset.filepaths[2] == str(starry_path)
+
+def test_roboframe_set_getitem(sm, starry_path, fragment_path):
+    frames = [RoboFrame(1, 0.5, sm.SE3.Rx(0.3, t=[1, 2, 3])), RoboFrameImage(starry_path),
+              RoboFramePointCloud(fragment_path)]
+    frames[1].frame_id = 5
+    frameset = RoboFrameSet.from_frames(frames)
+
+    frame = frameset[0]
+    assert type(frame) == RoboFrame
+    assert frame.frame_id == 1 and frame.timestamp == 0.5
+    assert type(frame.frame_id) is int and type(frameset[1].frame_id) is int
+    assert np.array_equal(frame.pose.A, frames[0].pose.A)
+
+    frame = frameset[1]
+    assert type(frame) == RoboFrameImage
+    assert frame.frame_id == 5 and frame.timestamp is None and frame.pose is None
+    assert frame.filepath == frames[1].filepath
+
+    assert type(frameset[2]) == RoboFramePointCloud
+    assert [x.frame_id for x in frameset] == [1, 5, 1]
+
+# Test iterating a set prefetches the next frame's file, and a missing file does not stop the iteration
+def test_roboframe_set_iter_prefetch(monkeypatch, starry_path):
+    import robotools.roboframes
+    prefetched = []
+    monkeypatch.setattr(robotools.roboframes, "prefetch_file", prefetched.append)
+
+    frameset = RoboFrameSet.from_columns([1, 2, 3], filepaths=[starry_path, None, starry_path])
+    assert [x.frame_id for x in frameset] == [1, 2, 3]
+    assert prefetched == [str(starry_path)]
+
+    monkeypatch.undo()
+    frameset = RoboFrameSet.from_columns([1, 2], filepaths=["/path/to/file/frame_001.png", "/path/to/file/frame_002.png"])
+    assert [x.frame_id for x in frameset] == [1, 2]
+
+def test_roboframe_set_get_pose_data(sm):
+    frames = [RoboFrame(1, pose=sm.SE3.Rx(0.3, t=[1, 2, 3])), RoboFrame(2), RoboFrame(3, pose=sm.SE3.Rz(-2.5, t=[4, 5, 6]))]
+    data = RoboFrameSet.from_frames(frames).get_pose_data()
+
+    for key in PoseComponents.FULL:
+        assert data[key].shape == (3,)
+        assert np.isclose(data[key][0], frames[0].get_pose_data()[key], rtol=0, atol=1e-15)
+        assert np.isnan(data[key][1])
+        assert np.isclose(data[key][2], frames[2].get_pose_data()[key], rtol=0, atol=1e-15)
+
+def test_roboframe_set_set_pose():
+    frameset = RoboFrameSet(2)
+    assert frameset.set_pose(0, pos_x=1, pos_y=2, pos_z=3, quat_w=0, quat_x=1, quat_y=0, quat_z=0) == True
+    assert frameset.set_pose(1, pos_x=1) == False
+
+    frame = RoboFrame(1)
+    frame.set_pose(pos_x=1, pos_y=2, pos_z=3, quat_w=0, quat_x=1, quat_y=0, quat_z=0)
+    assert np.array_equal(frameset.poses[0], frame.pose.A)
+    assert np.isnan(frameset.poses[1]).all()
 
-    pcd2 = o3d.io.read_point_cloud(str(filepath))
+def test_roboframe_set_from_columns(sm, starry_path, fragment_path):
+    poses = np.stack([sm.SE3.Rx(0.3, t=[1, 2, 3]).A, sm.SE3().A])
+    filepaths = [starry_path, fragment_path]
+    frameset = RoboFrameSet.from_columns([1, 2], timestamps=[0.5, 1.5], poses=poses, filepaths=filepaths)
 
-    pcd1_pts = np.asarray(pcd1.points)
-    pcd1_col = np.asarray(pcd1.colors)
-    pcd2_pts = np.asarray(pcd2.points)
-    pcd2_col = np.asarray(pcd2.colors)
-    assert np.sum(pcd1_pts - pcd2_pts) == 0
-    assert np.sum(pcd1_col - pcd2_col) == 0
\ No newline at end of file
+    assert np.array_equal(frameset.frame_ids, [1, 2])
+    assert np.array_equal(frameset.timestamps, [0.5, 1.5])
+    assert np.array_equal(frameset.poses, poses)
+    assert list(frameset.filepaths) == [str(x) for x in filepaths]
+    assert type(frameset[1]) == RoboFramePointCloud
+
+    frameset = RoboFrameSet.from_columns(np.arange(3))
+    assert np.isnan(frameset.timestamps).all() and np.isnan(frameset.poses).all()
+
+    with pytest.raises(ValueError):
+        RoboFrameSet.from_columns([1, 2], timestamps=[0.5])
+
+# Test a set with frames without a file round trips through its columns
+def test_roboframe_set_from_columns_round_trip(sm, starry_path):
+    frames = [RoboFrame(1, 0.5, sm.SE3.Rx(0.3, t=[1, 2, 3])), RoboFrameImage(starry_path)]
+    frameset = RoboFrameSet.from_frames(frames)
+    copy = RoboFrameSet.from_columns(frameset.frame_ids, frameset.timestamps, frameset.poses, frameset.filepaths)
+
+    assert np.array_equal(copy.frame_ids, frameset.frame_ids)
+    assert np.array_equal(copy.timestamps, frameset.timestamps, equal_nan=True)
+    assert np.array_equal(copy.poses, frameset.poses, equal_nan=True)
+    assert list(copy.filepaths) == [None, str(starry_path)]
+    assert type(copy[0]) == RoboFrame
+
+def test_roboframe_set_to_arrow(sm, starry_path):
+    pa = pytest.importorskip("pyarrow")
+    frames = [RoboFrame(1, 0.5, sm.SE3.Rx(0.3, t=[1, 2, 3])), RoboFrameImage(starry_path)]
+    table = RoboFrameSet.from_frames(frames).to_arrow()
+
+    assert table.column_names == ['frame_id', 'timestamp'] + list(PoseComponents.FULL_ORDER) + ['filepath']
+    assert table.column('frame_id').to_pylist() == [1, 1]
+    assert table.column('timestamp').to_pylist() == [0.5, None]
+    assert table.column('pos_z').to_pylist() == [3, None]
+    assert table.column('filepath').to_pylist() == [None, str(starry_path)]
+
+def test_roboframe_set_to_pandas(sm):
+    pytest.importorskip("pandas")
+    frames = [RoboFrame(1, 0.5, sm.SE3.Rx(0.3, t=[1, 2, 3])), RoboFrame(2)]
+    df = RoboFrameSet.from_frames(frames).to_pandas()
+
+    assert list(df.columns) == ['frame_id', 'timestamp'] + list(PoseComponents.FULL_ORDER) + ['filepath']
+    assert list(df['frame_id']) == [1, 2]
+    assert np.isclose(df['quat_w'][0], frames[0].get_pose_data()['quat_w'], rtol=0, atol=1e-15)
+    assert np.isnan(df['quat_w'][1])
+
+def test_roboframe_set_from_directory(tmp_path):
+    for filename in ["frame_002.png", "frame_001.png", "frame_notes_003.ply", "frame_004.csv", "readme.txt"]:
+        (tmp_path / filename).touch()
+    (tmp_path / "subdir_005.png").mkdir()
+
+    frameset = RoboFrameSet.from_directory(tmp_path)
+    assert np.array_equal(frameset.frame_ids, [1, 2, 3])
+    assert list(frameset.filepaths) == [str(tmp_path / x) for x in ["frame_001.png", "frame_002.png", "frame_notes_003.ply"]]
+    assert [type(x) for x in frameset] == [RoboFrameImage, RoboFrameImage, RoboFramePointCloud]
+
+    frameset = RoboFrameSet.from_directory(tmp_path, pattern="*.ply")
+    assert np.array_equal(frameset.frame_ids, [3])